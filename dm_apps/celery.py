@@ -49,4 +49,9 @@ app.conf.beat_schedule = {
         'task': 'maintenance_reminder_email',
         'schedule': 60 * 60 * 12,  # execute every 12 hours
     },
+    # fisheriescape
+    'fisheriescape_warm_score_caches': {
+        'task': 'fisheriescape_warm_score_caches',
+        'schedule': 60 * 60 * 24,  # execute every day
+    },
 }
@@ -1,13 +1,70 @@
 from django.contrib.gis import admin
+from .cache import VULNERABLE_SPECIES_SPOTS_DATASET, bump_generation, invalidate_score_references, invalidate_scores
 from .models import FisheryArea, MarineMammal, Week, Hexagon, Score, Mitigation, NAFOArea, VulnerableSpecies, \
-    VulnerableSpeciesSpot
+    VulnerableSpeciesSpot, ImportJob
+from .scripts import refresh_hexagon_spot_densities, refresh_species_score_stats
+
+
+class CacheInvalidationAdmin(admin.ModelAdmin):
+    """ Invalidate the API caches built from a model when it is edited through the admin """
+
+    def invalidate(self, objects):
+        """ Called with the edited or deleted objects; extending classes drop what is built from them """
+        pass
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self.invalidate([obj])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.invalidate([obj])
+
+    def delete_queryset(self, request, queryset):
+        objects = list(queryset)
+        super().delete_queryset(request, queryset)
+        self.invalidate(objects)
+
+
+class HexagonAdmin(CacheInvalidationAdmin):
+    def invalidate(self, objects):
+        invalidate_score_references()
+
+
+class ScoreAdmin(CacheInvalidationAdmin):
+    def save_model(self, request, obj, form, change):
+        previous = Score.objects.get(pk=obj.pk) if change else None
+        super().save_model(request, obj, form, change)
+        if previous:
+            # the pair the score is moved out of is refreshed as well, once the score has left it
+            self.invalidate([previous])
+
+    def invalidate(self, objects):
+        species_weeks = {(score.species_id, score.week_id) for score in objects}
+        refresh_species_score_stats(species_weeks)
+        invalidate_scores(species_weeks)
+
+
+class VulnerableSpeciesSpotAdmin(CacheInvalidationAdmin):
+    def save_model(self, request, obj, form, change):
+        previous = VulnerableSpeciesSpot.objects.get(pk=obj.pk) if change else None
+        super().save_model(request, obj, form, change)
+        if previous:
+            # the pair the spot is moved out of is counted again as well
+            self.invalidate([previous])
+
+    def invalidate(self, objects):
+        refresh_hexagon_spot_densities({(spot.vulnerable_species_id, spot.week_id) for spot in objects})
+        bump_generation(VULNERABLE_SPECIES_SPOTS_DATASET)
+
 
 admin.site.register(FisheryArea, admin.GeoModelAdmin)
 admin.site.register(NAFOArea, admin.GeoModelAdmin)
 admin.site.register(MarineMammal, admin.ModelAdmin)
 admin.site.register(Week, admin.ModelAdmin)
-admin.site.register(Hexagon, admin.ModelAdmin)
-admin.site.register(Score, admin.ModelAdmin)
+admin.site.register(Hexagon, HexagonAdmin)
+admin.site.register(Score, ScoreAdmin)
 admin.site.register(Mitigation, admin.ModelAdmin)
 admin.site.register(VulnerableSpecies, admin.ModelAdmin)
-admin.site.register(VulnerableSpeciesSpot, admin.ModelAdmin)
+admin.site.register(VulnerableSpeciesSpot, VulnerableSpeciesSpotAdmin)
+admin.site.register(ImportJob, admin.ModelAdmin)
@@ -0,0 +1,166 @@
+import base64
+import json
+import sys
+from array import array
+
+from .. import models
+from ..utils import use_simplified_polygons
+from .serializers import get_max_fs_score
+
+# Score maps split into the hexagon grid, downloaded once, and compact arrays of scores aligned to the grid order,
+# downloaded for each species and week, or for a whole season at once.
+
+SCORE_FIELDS = ["site_score", "ceu_score", "fs_score"]
+
+# Season bundles quantize each score field to integers within +/- SEASON_QUANTIZATION_RANGE, so that the difference
+# between two weeks always fits in an int16. Each week is sent as the little-endian int16 deltas from the previous
+# week, base64 encoded, along with a bitmap of the hexagons that have a score. A hexagon without a score keeps the
+# quantized value of the previous week so that its delta is 0.
+SEASON_ENCODING = "int16-delta-base64"
+SEASON_QUANTIZATION_RANGE = 16383
+
+
+def get_hexagon_ids() -> list:
+    """ Ids of the hexagons in the grid order: the position of a hexagon is its index in the score arrays """
+    return list(models.Hexagon.objects.order_by("id").values_list("id", flat=True))
+
+
+def render_hexagon_geometry(level=None) -> bytes:
+    """ GeoJSON FeatureCollection of the whole hexagon grid, in the grid order """
+    hexagons = use_simplified_polygons(models.Hexagon.objects.only("grid_id", "polygon").order_by("id"), level)
+    features = [
+        {
+            "type": "Feature",
+            "id": index,
+            "geometry": json.loads(hexagon.polygon.geojson),
+            "properties": {"grid_id": hexagon.grid_id},
+        }
+        for index, hexagon in enumerate(hexagons)
+    ]
+    return json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":")).encode("utf-8")
+
+
+def render_score_arrays(hexagon_ids, species_name, week_number) -> dict:
+    """
+    Scores of a species for a week as one array per score field, aligned to the grid order. Hexagons without a score
+    are null.
+    """
+    index = {hexagon_id: position for position, hexagon_id in enumerate(hexagon_ids)}
+    arrays = {field: [None] * len(hexagon_ids) for field in SCORE_FIELDS}
+    scores = models.Score.objects.filter(
+        species__english_name=species_name,
+        week__week_number=week_number,
+    ).values_list("hexagon_id", "species_id", *SCORE_FIELDS)
+
+    species_ids = set()
+    for hexagon_id, species_id, *values in scores.iterator():
+        species_ids.add(species_id)
+        position = index.get(hexagon_id)
+        if position is None:
+            continue
+        for field, value in zip(SCORE_FIELDS, values):
+            arrays[field][position] = float(value) if value is not None else None
+
+    return {
+        "species": species_name,
+        "week": week_number,
+        "count": len(hexagon_ids),
+        "max_fs_score": get_max_fs_score(species_ids) if species_ids else 0,
+        **arrays,
+    }
+
+
+def encode_int16(values) -> str:
+    values = array("h", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def encode_bitmap(flags) -> str:
+    """ Flags packed in bytes, least significant bit first """
+    packed = bytearray((len(flags) + 7) // 8)
+    for position, flag in enumerate(flags):
+        if flag:
+            packed[position // 8] |= 1 << (position % 8)
+    return base64.b64encode(bytes(packed)).decode("ascii")
+
+
+def encode_season_column(weeks_values) -> dict:
+    """ Quantize and delta-encode the values of a score field for every week of the season """
+    max_value = max((abs(value) for values in weeks_values for value in values if value is not None), default=0)
+    scale = max_value / SEASON_QUANTIZATION_RANGE if max_value else 1
+    weeks = []
+    present = []
+    previous = [0] * len(weeks_values[0]) if weeks_values else []
+    for values in weeks_values:
+        quantized = [
+            round(value / scale) if value is not None else previous_value
+            for value, previous_value in zip(values, previous)
+        ]
+        weeks.append(encode_int16([value - previous_value for value, previous_value in zip(quantized, previous)]))
+        present.append(encode_bitmap([value is not None for value in values]))
+        previous = quantized
+    return {"scale": scale, "weeks": weeks, "present": present}
+
+
+def render_score_season(hexagon_ids, species_name, fields=("fs_score",)) -> dict:
+    """
+    Scores of a species for every week of the season, aligned to the grid order and encoded as described by
+    SEASON_ENCODING, from a single query over the scores
+    """
+    index = {hexagon_id: position for position, hexagon_id in enumerate(hexagon_ids)}
+    weeks = list(models.Week.objects.order_by("week_number").values_list("id", "week_number"))
+    week_positions = {week_id: position for position, (week_id, week_number) in enumerate(weeks)}
+    columns = {field: [[None] * len(hexagon_ids) for week in weeks] for field in fields}
+    scores = models.Score.objects.filter(species__english_name=species_name).order_by(
+        "week_id", "hexagon_id").values_list("week_id", "hexagon_id", "species_id", *fields)
+
+    species_ids = set()
+    for week_id, hexagon_id, species_id, *values in scores.iterator():
+        species_ids.add(species_id)
+        position = index.get(hexagon_id)
+        if position is None:
+            continue
+        for field, value in zip(fields, values):
+            columns[field][week_positions[week_id]][position] = float(value) if value is not None else None
+
+    return {
+        "species": species_name,
+        "count": len(hexagon_ids),
+        "weeks": [week_number for week_id, week_number in weeks],
+        "max_fs_score": get_max_fs_score(species_ids) if species_ids else 0,
+        "encoding": SEASON_ENCODING,
+        "fields": {field: encode_season_column(columns[field]) for field in fields},
+    }
+
+
+def render_hexagon_timeseries(hexagon, species_names=None) -> dict:
+    """ Scores of a hexagon for every week, per species, for the given species or for all of them """
+    species = models.Species.objects.all()
+    if species_names:
+        species = species.filter(english_name__in=species_names)
+    species_names = dict(species.values_list("id", "english_name"))
+    scores = models.Score.objects.filter(hexagon=hexagon, species__in=list(species_names)).order_by(
+        "species_id", "week__week_number").values_list("species_id", "week__week_number", *SCORE_FIELDS)
+
+    timeseries = {}
+    for species_id, week_number, *values in scores:
+        series = timeseries.setdefault(species_names[species_id], {"weeks": [], **{field: [] for field in SCORE_FIELDS}})
+        series["weeks"].append(week_number)
+        for field, value in zip(SCORE_FIELDS, values):
+            series[field].append(float(value) if value is not None else None)
+
+    return {"grid_id": hexagon.grid_id, "species": timeseries}
+
+
+def render_hexagon_week_scores(hexagon_id, week_number) -> list:
+    """ Scores of a hexagon for a week, one per species, read through the (hexagon, species, week) index """
+    scores = models.Score.objects.filter(hexagon_id=hexagon_id, week__week_number=week_number).order_by(
+        "species__english_name").values_list("species__english_name", *SCORE_FIELDS)
+    return [
+        {"species": species_name, **{
+            field: float(value) if value is not None else None for field, value in zip(SCORE_FIELDS, values)
+        }}
+        for species_name, *values in scores
+    ]
@@ -0,0 +1,75 @@
+from django.db import connection
+from django.db.models import F
+
+# Vulnerable species spots aggregated by PostGIS into clusters for a map zoom, so that dense weeks are drawn as
+# hundreds of markers rather than tens of thousands. Each cluster has the summed count of every species in it.
+# The spots are stored as (lat, lon) points: the clusters are returned as GeoJSON points in (lon, lat) order.
+
+CLUSTER_METHODS = ("grid", "kmeans")
+MAX_ZOOM = 22
+# grid cells per tile width: at 256 pixels per tile, a cell is 32 pixels wide
+CLUSTER_GRID_DIVISIONS = 8
+# k-means clusters at zoom 0, doubled at each zoom up to the maximum
+KMEANS_BASE_CLUSTERS = 8
+KMEANS_MAX_CLUSTERS = 400
+
+CLUSTER_EXPRESSIONS = {
+    "grid": "ST_AsText(ST_SnapToGrid(spots.point, %s))",
+    "kmeans": "ST_ClusterKMeans(spots.point, %s) OVER ()",
+}
+
+SPOT_CLUSTERS_SQL = """
+    WITH spots AS ({spots}),
+    clustered AS (
+        SELECT {cluster} AS cluster, spots.point, spots.species, spots.count
+        FROM spots
+    )
+    SELECT cluster, species, SUM(COALESCE(count, 0)), COUNT(*), AVG(ST_Y(point)), AVG(ST_X(point))
+    FROM clustered
+    GROUP BY cluster, species
+    ORDER BY cluster, species
+"""
+
+
+def get_cluster_parameter(method, zoom):
+    """ Grid size in degrees or number of k-means clusters for a zoom """
+    zoom = min(max(zoom, 0), MAX_ZOOM)
+    if method == "kmeans":
+        return min(KMEANS_BASE_CLUSTERS * 2 ** zoom, KMEANS_MAX_CLUSTERS)
+    return 360 / 2 ** zoom / CLUSTER_GRID_DIVISIONS
+
+
+def render_spot_clusters(queryset, zoom, method="grid") -> list:
+    """
+    Clusters of the VulnerableSpeciesSpot rows of a filtered queryset, with their position as the mean position of
+    their spots, the summed count and the number of spots per species
+    """
+    spots = queryset.order_by().values("point", "count", species=F("vulnerable_species__english_name"))
+    spots_sql, spots_params = spots.query.sql_with_params()
+    sql = SPOT_CLUSTERS_SQL.format(spots=spots_sql, cluster=CLUSTER_EXPRESSIONS[method])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*spots_params, get_cluster_parameter(method, zoom)])
+        rows = cursor.fetchall()
+
+    clusters = {}
+    for cluster_id, species, count, spot_count, lon, lat in rows:
+        cluster = clusters.setdefault(cluster_id, {"count": 0, "spots": 0, "lon": 0, "lat": 0, "species": {}})
+        cluster["count"] += count
+        cluster["spots"] += spot_count
+        # weighted by the number of spots, so that the position is the mean of all the spots of the cluster
+        cluster["lon"] += lon * spot_count
+        cluster["lat"] += lat * spot_count
+        cluster["species"][species] = {"count": count, "spots": spot_count}
+
+    return [
+        {
+            "point": {
+                "type": "Point",
+                "coordinates": [cluster["lon"] / cluster["spots"], cluster["lat"] / cluster["spots"]],
+            },
+            "count": cluster["count"],
+            "spots": cluster["spots"],
+            "species": cluster["species"],
+        }
+        for cluster in clusters.values()
+    ]
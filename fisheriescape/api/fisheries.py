@@ -0,0 +1,94 @@
+import datetime
+
+from django.utils import timezone
+from psycopg2.extras import DateTimeTZRange
+
+from .. import models
+
+# Fisheries open during score weeks, found with the GiST index of Fishery.season
+
+
+def get_week_period(week, year=None):
+    """
+    Period of a week as a range of aware datetimes, from the start of its first day to the end of its last one, moved
+    to another year when one is given. None for a week without dates.
+    """
+    if not week.approx_start or not week.approx_end:
+        return None
+    start, end = week.approx_start, week.approx_end
+    if year is not None:
+        try:
+            start, end = start.replace(year=year), end.replace(year=year + end.year - start.year)
+        except ValueError:
+            # 29 February outside of a leap year
+            return None
+    return DateTimeTZRange(
+        timezone.make_aware(datetime.datetime.combine(start, datetime.time.min)),
+        timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min)),
+        "[)",
+    )
+
+
+def get_active_fisheries(period):
+    """ Fisheries whose season overlaps a period, with their species and fishery areas """
+    return models.Fishery.objects.filter(season__overlap=period).select_related("species").prefetch_related(
+        "fishery_areas").order_by("start_date", "id")
+
+
+def get_week_fisheries(week_number, fishery_area_ids, year=None) -> list:
+    """ Fisheries of any of the given fishery areas open during a week """
+    week = models.Week.objects.filter(week_number=week_number).first()
+    period = get_week_period(week, year) if week else None
+    if period is None or not fishery_area_ids:
+        return []
+    fisheries = get_active_fisheries(period).filter(fishery_areas__in=fishery_area_ids).distinct()
+    return [serialize_fishery(fishery) for fishery in fisheries]
+
+
+def serialize_fishery(fishery) -> dict:
+    return {
+        "id": fishery.id,
+        "species": str(fishery.species),
+        "fishery_status": fishery.fishery_status,
+        "gear_type": fishery.gear_type,
+        "gear_amount": fishery.gear_amount,
+        "gear_config": fishery.gear_config,
+        "gear_soak": fishery.gear_soak,
+        "gear_colours": [
+            colour for colour in (
+                fishery.gear_primary_colour, fishery.gear_secondary_colour, fishery.gear_tertiary_colour
+            ) if colour
+        ],
+        "start_date": fishery.start_date.isoformat(),
+        "end_date": fishery.end_date.isoformat(),
+        "fishery_areas": [
+            {"id": area.id, "layer_id": area.layer_id, "name": area.name}
+            for area in fishery.fishery_areas.all()
+        ],
+    }
+
+
+def render_fishery_calendar(year=None) -> list:
+    """
+    Fisheries open during each week. The fisheries of the whole calendar are read in one indexed query and then
+    spread over the weeks.
+    """
+    weeks = [(week, get_week_period(week, year)) for week in models.Week.objects.order_by("week_number")]
+    periods = [period for week, period in weeks if period is not None]
+    fisheries = []
+    if periods:
+        span = DateTimeTZRange(min(period.lower for period in periods), max(period.upper for period in periods), "[)")
+        fisheries = [(fishery, serialize_fishery(fishery)) for fishery in get_active_fisheries(span)]
+
+    return [
+        {
+            "week": week.week_number,
+            "approx_start": period.lower.date().isoformat() if period else None,
+            "approx_end": (period.upper.date() - datetime.timedelta(days=1)).isoformat() if period else None,
+            "fisheries": [
+                data for fishery, data in fisheries
+                if period and fishery.start_date < period.upper and fishery.end_date >= period.lower
+            ],
+        }
+        for week, period in weeks
+    ]
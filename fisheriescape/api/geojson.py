@@ -0,0 +1,162 @@
+from django.db import connection
+
+from .. import models
+
+# Alternative rendering of the score feature collections where PostGIS builds the whole GeoJSON document in a
+# single query. The output has the same shape as the ScoreFeatureSerializer and ScoreFeatureCombinedSerializer
+# feature collections but no python object is created per feature.
+
+# number of decimals kept in the coordinates when no precision is requested
+DEFAULT_GEOJSON_PRECISION = 6
+MAX_GEOJSON_PRECISION = 15
+
+SCORE_FEATURES_SQL = """
+    WITH scores AS (
+        SELECT s.id, s.species_id, s.site_score, s.ceu_score, s.fs_score, sp.english_name, w.week_number,
+               h.grid_id, COALESCE(simplified.polygon, h.polygon) AS polygon
+        FROM {score} s
+        JOIN {species} sp ON sp.id = s.species_id
+        JOIN {week} w ON w.id = s.week_id
+        JOIN {hexagon} h ON h.id = s.hexagon_id
+        LEFT JOIN {simplified_polygon} simplified ON simplified.hexagon_id = h.id AND simplified.level = %s
+        {where}
+    )
+    SELECT json_build_object(
+        'type', 'FeatureCollection',
+        'max_fs_score', (
+            SELECT COALESCE(SUM(species_max.fs_score), 0) FROM (
+                SELECT MAX(fs_score) AS fs_score FROM {score}
+                WHERE species_id IN (SELECT species_id FROM scores)
+                GROUP BY species_id
+            ) species_max
+        ),
+        'features', COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', id,
+                'type', 'Feature',
+                'geometry', ST_AsGeoJSON(polygon, %s)::json,
+                'properties', json_build_object(
+                    'species', english_name,
+                    'week', 'Week ' || week_number,
+                    'grid_id', grid_id,
+                    'site_score', site_score::text,
+                    'ceu_score', ceu_score::text,
+                    'fs_score', fs_score::text
+                )
+            ) ORDER BY id)
+            FROM scores
+        ), '[]'::json)
+    )::text
+"""
+
+SCORE_FEATURES_COMBINED_SQL = """
+    WITH scores AS (
+        SELECT s.hexagon_id, s.week_id, SUM(s.fs_score) AS fs_score,
+               STRING_AGG(sp.english_name, ',') AS species, COUNT(s.id) AS species_count, SUM(s.id) AS id,
+               ARRAY_AGG(s.species_id) AS species_ids
+        FROM {score} s
+        JOIN {species} sp ON sp.id = s.species_id
+        JOIN {week} w ON w.id = s.week_id
+        JOIN {hexagon} h ON h.id = s.hexagon_id
+        {where}
+        GROUP BY s.hexagon_id, s.week_id
+    )
+    SELECT json_build_object(
+        'type', 'FeatureCollection',
+        'max_fs_score', (
+            SELECT COALESCE(SUM(species_max.fs_score), 0) FROM (
+                SELECT MAX(fs_score) AS fs_score FROM {score}
+                WHERE species_id IN (SELECT UNNEST(species_ids) FROM scores)
+                GROUP BY species_id
+            ) species_max
+        ),
+        'features', COALESCE((
+            SELECT json_agg(json_build_object(
+                'type', 'Feature',
+                'geometry', ST_AsGeoJSON(COALESCE(simplified.polygon, h.polygon), %s)::json,
+                'properties', json_build_object(
+                    'id', scores.id,
+                    'species', scores.species,
+                    'week', scores.week_id::text,
+                    'fs_score', scores.fs_score::text,
+                    'grid_id', h.grid_id,
+                    'species_count', scores.species_count
+                )
+            ))
+            FROM scores
+            JOIN {hexagon} h ON h.id = scores.hexagon_id
+            LEFT JOIN {simplified_polygon} simplified ON simplified.hexagon_id = h.id AND simplified.level = %s
+        ), '[]'::json)
+    )::text
+"""
+
+
+def get_precision(value) -> int:
+    """ Parse a requested coordinate precision, falling back to the default one """
+    try:
+        return min(max(int(value), 0), MAX_GEOJSON_PRECISION)
+    except (TypeError, ValueError):
+        return DEFAULT_GEOJSON_PRECISION
+
+
+def get_tables() -> dict:
+    return {
+        "score": models.Score._meta.db_table,
+        "species": models.Species._meta.db_table,
+        "week": models.Week._meta.db_table,
+        "hexagon": models.Hexagon._meta.db_table,
+        "simplified_polygon": models.SimplifiedPolygon._meta.db_table,
+    }
+
+
+def get_where_clause(species_list, week, viewport=None, areas=None) -> tuple:
+    """
+    Conditions on the species names, the week number, the viewport polygon and the areas the hexagons overlap (see
+    utils.get_area_filters_from_params), already validated by the views. As in the ORM views, the viewport is
+    compared with the bounding box of the hexagons so that their GiST index is used.
+    """
+    conditions = []
+    params = []
+    if species_list:
+        conditions.append("sp.english_name = ANY(%s)")
+        params.append(list(species_list))
+    if week is not None:
+        conditions.append("w.week_number = %s")
+        params.append(week)
+    if viewport is not None:
+        conditions.append("h.polygon && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
+        params.extend(viewport.extent)
+    for field, area_id in (areas or {}).items():
+        column = models.HexagonAreaOverlap._meta.get_field(field).column
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM {models.HexagonAreaOverlap._meta.db_table} o "
+            f"WHERE o.hexagon_id = s.hexagon_id AND o.{column} = %s)")
+        params.append(area_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def fetch_feature_collection(sql, params) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+
+def render_score_features(species=None, week=None, precision=DEFAULT_GEOJSON_PRECISION, level=None,
+                          viewport=None, areas=None) -> str:
+    """
+    GeoJSON text of the ScoreFeatureView feature collection, with the hexagons simplified at a SimplifiedPolygon
+    level when one is given
+    """
+    where, params = get_where_clause([species] if species else None, week, viewport, areas)
+    sql = SCORE_FEATURES_SQL.format(where=where, **get_tables())
+    # the simplification level is joined before the filters and the precision comes after them
+    return fetch_feature_collection(sql, [level] + params + [precision])
+
+
+def render_score_features_combined(species_list=None, week=None, precision=DEFAULT_GEOJSON_PRECISION,
+                                   level=None, viewport=None, areas=None) -> str:
+    """ GeoJSON text of the ScoreFeatureCombinedView feature collection """
+    where, params = get_where_clause(species_list, week, viewport, areas)
+    sql = SCORE_FEATURES_COMBINED_SQL.format(where=where, **get_tables())
+    return fetch_feature_collection(sql, params + [precision, level])
@@ -0,0 +1,21 @@
+from django.core.serializers import serialize
+
+from .. import models
+from ..utils import use_simplified_polygons
+
+# Polygon overlays of the score map, keyed by the layer id of their polygons. They are fetched by the map when toggled
+# rather than inlined in the page.
+MAP_LAYERS = {
+    "Lobster": models.FisheryArea,
+    "Crab": models.FisheryArea,
+    "Herring": models.FisheryArea,
+    "Groundfish": models.FisheryArea,
+    "NAFO Subareas": models.FisheryArea,
+    "NAFO": models.NAFOArea,
+}
+
+
+def render_map_layer(layer_id, level=None) -> bytes:
+    """ GeoJSON FeatureCollection of the polygons of a map overlay, simplified at a SimplifiedPolygon level """
+    queryset = MAP_LAYERS[layer_id].objects.filter(layer_id=layer_id)
+    return serialize("geojson", use_simplified_polygons(queryset, level)).encode("utf-8")
@@ -8,7 +8,8 @@ from rest_framework_gis.serializers import GeoFeatureModelSerializer, GeometrySe
 from django.db import models
 from drf_extra_fields.geo_fields import PointField
 
-from fisheriescape.models import Score, Hexagon, Species, Week, VulnerableSpecies, VulnerableSpeciesSpot
+from fisheriescape.models import Score, Hexagon, Species, Week, VulnerableSpecies, VulnerableSpeciesSpot, ImportJob, \
+    SpeciesScoreStats
 
 
 ## doesn't work with leaflet implementation as yet
@@ -60,33 +61,47 @@ class HexagonSerializer(GeoFeatureModelSerializer):
 #
 ## BUT need GeoFeatureModelSerializer to use getJSON in map3.js---is there another way to import api endpoint into .js file?
 
+EMPTY_SPOT_DENSITY = {"spot_total_count": 0, "spot_sighting_count": 0}
+
+
+def get_max_fs_score(species_ids) -> float:
+    """
+    Sum of the season maximum fs_score of the species, read from SpeciesScoreStats. Species that have no statistics
+    yet are aggregated from the Score table.
+    """
+    max_fs_scores = dict(SpeciesScoreStats.objects.filter(species__in=species_ids, week__isnull=True).values_list(
+        "species", "fs_score_max"))
+    for species_id in set(species_ids) - set(max_fs_scores):
+        max_fs_scores[species_id] = Score.objects.filter(species=species_id).aggregate(
+            models.Max('fs_score')).get('fs_score__max')
+    return sum(max_fs_score or 0 for max_fs_score in max_fs_scores.values())
+
+
 class CustomGeoFeatureModelListSerializer(ListSerializer):
     @property
     def data(self):
         return super(ListSerializer, self).data
 
+    def get_max_fs_score(self, data):
+        """ Top of the colour scale of the map """
+        if isinstance(data[0], Score):
+            # Single species
+            species_ids = {score.species_id for score in data}
+        else:
+            # Combined data from multiple species
+            species_names = set()
+            for score in data:
+                species_names.update(score.get('species').split(','))
+            species_ids = set(Species.objects.filter(english_name__in=species_names).values_list("id", flat=True))
+        return get_max_fs_score(species_ids)
+
     def to_representation(self, data):
         """
         Add GeoJSON compatible formatting to a serialized queryset list
         """
         max_fs_score = 0
         if data:
-            if isinstance(data[0], Score):
-                # Single species
-                species_list = {score.species for score in data.all()}
-                max_fs_score = sum(
-                    [Score.objects.filter(species=species).aggregate(models.Max('fs_score')).get('fs_score__max') for
-                     species in species_list])
-            else:
-                # Combined data from multiple species
-                species_names = set()
-                for score in data:
-                    species_names.update(score.get('species').split(','))
-
-                for species in species_names:
-                    species_max_fs_score = Score.objects.filter(species__english_name=species).aggregate(
-                        models.Max('fs_score')).get('fs_score__max')
-                    max_fs_score += species_max_fs_score
+            max_fs_score = self.get_max_fs_score(data)
 
         return OrderedDict(
             (
@@ -97,6 +112,12 @@ class CustomGeoFeatureModelListSerializer(ListSerializer):
         )
 
 
+class WeekRangeGeoFeatureListSerializer(CustomGeoFeatureModelListSerializer):
+    def get_max_fs_score(self, data):
+        """ Aggregated scores may exceed the season maximums, the scale follows the highest aggregate instead """
+        return max((float(score.get('fs_score') or 0) for score in data), default=0)
+
+
 class ScoreFeatureSerializer(GeoFeatureModelSerializer):
     """A class to serialize hex polygons as GeoJSON compatible data"""
 
@@ -111,6 +132,14 @@ class ScoreFeatureSerializer(GeoFeatureModelSerializer):
     def get_grid_id(self, obj):
         return obj.hexagon.grid_id
 
+    def to_representation(self, instance):
+        """ Spots of vulnerable species are added to the properties when the view passes `spot_densities` """
+        feature = super().to_representation(instance)
+        spot_densities = self.context.get('spot_densities')
+        if spot_densities is not None:
+            feature["properties"].update(spot_densities.get((instance.hexagon_id, instance.week_id), EMPTY_SPOT_DENSITY))
+        return feature
+
     class Meta:
         model = Score
         geo_field = 'hexagon'
@@ -144,13 +173,19 @@ class ScoreFeatureCombinedSerializer(GeoFeatureModelSerializer):
     grid_id = SerializerMethodField()
     species_count = SerializerMethodField()
 
-    def get_hexagon(self, obj):
+    def get_hexagon_instance(self, obj):
+        """ Hexagons are resolved in bulk by the view and passed in the `hexagons` context, keyed by id """
         hexagon_id = obj.get('hexagon')
-        return Hexagon.objects.get(id=hexagon_id).polygon
+        hexagons = self.context.get('hexagons')
+        if hexagons is None:
+            return Hexagon.objects.get(id=hexagon_id)
+        return hexagons[hexagon_id]
+
+    def get_hexagon(self, obj):
+        return self.get_hexagon_instance(obj).polygon
 
     def get_grid_id(self, obj):
-        hexagon_id = obj.get('hexagon')
-        return Hexagon.objects.get(id=hexagon_id).grid_id
+        return self.get_hexagon_instance(obj).grid_id
 
     def get_species_count(self, obj):
         return obj.get('species_count')
@@ -159,7 +194,8 @@ class ScoreFeatureCombinedSerializer(GeoFeatureModelSerializer):
         model = Score
         id_field = None
         geo_field = 'hexagon'
-        fields = "__all__"
+        # one row sums the scores of several species: only the fs score is meaningful
+        exclude = ("site_score", "ceu_score")
 
     # Override base method to use our custom GeoFeatureModelListSerializer
     @classmethod
@@ -180,6 +216,32 @@ class ScoreFeatureCombinedSerializer(GeoFeatureModelSerializer):
         return list_serializer_class(*args, **list_kwargs)
 
 
+class ScoreFeatureWeekRangeSerializer(ScoreFeatureCombinedSerializer):
+    """ Scores of each hexagon aggregated over a range of weeks, the range is passed in the `weeks` context """
+    week = SerializerMethodField()
+    week_count = SerializerMethodField()
+    # sums over a season may not fit the decimal fields of the model
+    site_score = serializers.FloatField(read_only=True)
+    ceu_score = serializers.FloatField(read_only=True)
+    fs_score = serializers.FloatField(read_only=True)
+
+    def get_week(self, obj):
+        return self.context.get('weeks')
+
+    def get_week_count(self, obj):
+        return obj.get('week_count')
+
+    class Meta:
+        # declared in full rather than inherited, since the aggregated site and ceu scores are kept, unlike in the
+        # combined features
+        model = Score
+        id_field = None
+        geo_field = 'hexagon'
+        fields = ("id", "hexagon", "species", "week", "site_score", "ceu_score", "fs_score", "grid_id", "species_count",
+                  "week_count")
+        list_serializer_class = WeekRangeGeoFeatureListSerializer
+
+
 class VulnerableSpeciesSpotsSerializer(ModelSerializer):
     point = PointField()
     vulnerable_species = StringRelatedField()
@@ -242,3 +304,24 @@ class WeekSerializer(serializers.ModelSerializer):
     class Meta:
         model = Week
         fields = "__all__"
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    type_display = serializers.CharField(source="get_type_display", read_only=True)
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    duration = serializers.FloatField(read_only=True)
+    rows_per_second = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        exclude = ["file", "updated_by"]
+
+
+class SpeciesScoreStatsSerializer(serializers.ModelSerializer):
+    species = StringRelatedField()
+    week = StringRelatedField()
+
+    class Meta:
+        model = SpeciesScoreStats
+        exclude = ["id"]
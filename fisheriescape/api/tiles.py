@@ -0,0 +1,47 @@
+from django.db import connection
+
+from .. import models
+
+# Mapbox vector tiles of the score hexagons, rendered by PostGIS
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+MVT_LAYER_NAME = "scores"
+MAX_ZOOM = 22
+
+SCORE_TILE_SQL = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom
+    ),
+    features AS (
+        SELECT ST_AsMVTGeom(ST_Transform(h.polygon, 3857), bounds.geom) AS geom,
+               s.id, h.grid_id, s.site_score::float8 AS site_score, s.ceu_score::float8 AS ceu_score,
+               s.fs_score::float8 AS fs_score
+        FROM {score} s
+        JOIN {species} sp ON sp.id = s.species_id
+        JOIN {week} w ON w.id = s.week_id
+        JOIN {hexagon} h ON h.id = s.hexagon_id
+        CROSS JOIN bounds
+        WHERE sp.english_name = %(species)s
+          AND w.week_number = %(week)s
+          AND h.polygon && ST_Transform(bounds.geom, 4326)
+    )
+    SELECT ST_AsMVT(features.*, %(layer)s, 4096, 'geom') FROM features
+"""
+
+
+def is_valid_tile(z, x, y) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def render_score_tile(species_name, week_number, z, x, y) -> bytes:
+    """ Vector tile of the hexagons of a tile with the scores of a species for a week """
+    sql = SCORE_TILE_SQL.format(
+        score=models.Score._meta.db_table,
+        species=models.Species._meta.db_table,
+        week=models.Week._meta.db_table,
+        hexagon=models.Hexagon._meta.db_table,
+    )
+    params = {"z": z, "x": x, "y": y, "species": species_name, "week": week_number, "layer": MVT_LAYER_NAME}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile else b""
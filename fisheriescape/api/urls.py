@@ -12,9 +12,23 @@ urlpatterns = [
 
     path("fisheriescape/scores-feature/", views.ScoreFeatureView.as_view(), name="scores-feature"),
     path("fisheriescape/scores-feature-combined/", views.ScoreFeatureCombinedView.as_view(), name="scores-feature-combined"),
+    path("fisheriescape/area-scores/", views.AreaScoreRollupView.as_view(), name="area-scores"),
+    path("fisheriescape/fishery-calendar/", views.FisheryCalendarView.as_view(), name="fishery-calendar"),
+    path("fisheriescape/hexagons/geometry/", views.HexagonGeometryView.as_view(), name="hexagon-geometry"),
+    path("fisheriescape/hexagons/<str:grid_id>/timeseries/", views.HexagonTimeseriesView.as_view(),
+         name="hexagon-timeseries"),
+    path("fisheriescape/locate/", views.LocateView.as_view(), name="locate"),
+    path("fisheriescape/scores-array/", views.ScoreArrayView.as_view(), name="scores-array"),
+    path("fisheriescape/scores-season/", views.ScoreSeasonView.as_view(), name="scores-season"),
+    path("fisheriescape/tiles/<str:species>/<int:week>/<int:z>/<int:x>/<int:y>.mvt", views.ScoreTileView.as_view(),
+         name="score-tile"),
+    path("fisheriescape/layers/<str:layer_id>/", views.MapLayerView.as_view(), name="map-layer"),
     path("fisheriescape/vulnerable-species-spots/", views.VulnerableSpeciesSpotsView.as_view(), name="vulnerable-species-spots"),
+    path("fisheriescape/import-jobs/<int:pk>/", views.ImportJobView.as_view(), name="import-job-detail"),
+    path("fisheriescape/cache-warming/", views.CacheWarmingView.as_view(), name="cache-warming"),
     # lookups
     path("fisheriescape/vulnerable-species/", views.VulnerableSpeciesView.as_view(), name="vulnerable-species"),
     path("fisheriescape/species/", views.SpeciesListAPIView.as_view(), name="fisheriescape-species-list"),
     path("fisheriescape/week/", views.WeekListAPIView.as_view(), name="fisheriescape-week-list"),
+    path("fisheriescape/species-score-stats/", views.SpeciesScoreStatsView.as_view(), name="species-score-stats"),
 ]
@@ -1,15 +1,20 @@
-from hashlib import md5
-
-from django.contrib.postgres.aggregates import StringAgg
-from django.core.checks import caches
-from django.db.models import Sum, Count
-from rest_framework.generics import ListAPIView
+from django.http import HttpResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from .serializers import ScoreFeatureSerializer, SpeciesSerializer, WeekSerializer, VulnerableSpeciesSerializer, \
-    VulnerableSpeciesSpotsSerializer, ScoreFeatureCombinedSerializer
-from .. import models
-from fisheriescape.views import FisheriescapeAccessRequired
+    VulnerableSpeciesSpotsSerializer, ScoreFeatureCombinedSerializer, ImportJobSerializer, SpeciesScoreStatsSerializer
+from . import bundles, clusters, fisheries, geojson, layers, tiles
+from .. import models, spatial_index
+from .. import cache as score_cache
+from ..utils import SIMPLIFICATION_PARAMS, VIEWPORT_PARAMS, filter_scores_by_area, flip_viewport, \
+    get_area_filters_from_params, get_simplification_level_from_params, get_viewport_from_params, get_viewport_key, \
+    use_simplified_polygons
+from fisheriescape.views import FisheriescapeAccessRequired, FisheriescapeAdminAccessRequired
 
 
 # class EntryCSVAPIView(ListAPIView):
@@ -78,32 +83,106 @@ from fisheriescape.views import FisheriescapeAccessRequired
 #         return queryset
 
 
+def get_viewport(request):
+    """ Viewport of the `bbox` and `zoom` query parameters, snapped to the tile grid, or None without a bbox """
+    try:
+        return get_viewport_from_params(request.query_params)
+    except ValueError as e:
+        raise ValidationError({"bbox": str(e)})
+
+
+def get_week_number(request):
+    """ Number of the `week` query parameter, or None without one """
+    week = request.query_params.get("week")
+    if not week:
+        return None
+    try:
+        return int(week)
+    except ValueError:
+        raise ValidationError({"week": "The week must be a number."})
+
+
+def get_area_filters(request):
+    """ Ids of the `fishery_area` and `nafo_area` the scores are limited to """
+    try:
+        return get_area_filters_from_params(request.query_params)
+    except ValueError as e:
+        raise ValidationError({"area": str(e)})
+
+
 class ScoreFeatureView(FisheriescapeAccessRequired, ListAPIView):
     queryset = models.Score.objects.all()
     serializer_class = ScoreFeatureSerializer
+    week_range_params = ("week_from", "week_to", "agg")
 
     # Cache the results
     def list(self, request, *args, **kwargs):
-        cache = caches.caches['default']
         species = self.request.query_params.get('species')
-        week = self.request.query_params.get('week')
-        cache_key = f"ScoreFeatureViewSet:{species}_{week}".encode('utf-8')
-        hashed_cache_key = md5(cache_key).hexdigest()
-        cached_results = cache.get(hashed_cache_key)
-        if cached_results:
-            return Response(cached_results)
-        else:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            cache.set(hashed_cache_key, serializer.data)
-            return Response(serializer.data)
+        week = get_week_number(request)
+        level = get_simplification_level_from_params(self.request.query_params)
+        viewport = get_viewport(request)
+        areas = get_area_filters(request)
+
+        # seasonal summaries are aggregated by the database over the range of weeks
+        if any(param in self.request.query_params for param in self.week_range_params):
+            return self.list_week_range(level, viewport, areas)
+
+        # let PostGIS render the whole feature collection
+        if self.request.query_params.get('render') == 'database':
+            precision = geojson.get_precision(self.request.query_params.get('precision'))
+            return HttpResponse(geojson.render_score_features(species, week, precision=precision, level=level,
+                                                              viewport=viewport, areas=areas),
+                                content_type="application/json")
+
+        # a single species and week is served from the GeoJSON rendered after each import
+        if species and week is not None and viewport is None and not areas and not self.with_spot_density():
+            return score_cache.payload_response(request, score_cache.get_score_features(species, week, level))
+
+        # the raw bbox is replaced by the snapped viewport so that nearby viewports share an entry
+        cache_key = score_cache.get_api_cache_key("ScoreFeatureView", score_cache.SCORES_DATASET,
+                                                  request.query_params, ignore=SIMPLIFICATION_PARAMS + VIEWPORT_PARAMS,
+                                                  level=level, bbox=get_viewport_key(viewport))
+        return Response(score_cache.get_or_render(cache_key, lambda: self.render_features(level)))
+
+    def with_spot_density(self):
+        return self.request.query_params.get('spot_density') == 'true'
+
+    def render_features(self, level):
+        scores = list(self.filter_queryset(self.get_queryset()))
+        use_simplified_polygons([score.hexagon for score in scores], level)
+        context = self.get_serializer_context()
+        if self.with_spot_density():
+            # `vulnerable_species=a,b` limits the spots counted, as in VulnerableSpeciesSpotsView
+            vulnerable_species = self.request.query_params.get('vulnerable_species')
+            context['spot_densities'] = score_cache.get_spot_densities(
+                scores, vulnerable_species.split(',') if vulnerable_species else None)
+        return self.get_serializer_class()(scores, many=True, context=context).data
+
+    def list_week_range(self, level, viewport=None, areas=None):
+        """ One feature per hexagon with the `agg` (mean, max or sum) of its scores from `week_from` to `week_to` """
+        try:
+            week_from = int(self.request.query_params.get('week_from') or 1)
+            week_to = int(self.request.query_params.get('week_to') or 53)
+        except ValueError:
+            raise ValidationError({"week_from": "Weeks must be numbers."})
+        agg = self.request.query_params.get('agg') or "mean"
+        if agg not in score_cache.WEEK_RANGE_AGGREGATES:
+            raise ValidationError({"agg": f"Choose among {', '.join(score_cache.WEEK_RANGE_AGGREGATES)}."})
+        species = sorted(set(self.request.query_params.getlist('species')))
+        return Response(score_cache.get_score_features_week_range(species, week_from, week_to, agg, level, viewport,
+                                                                  areas))
 
     def get_queryset(self):
         queryset = self.queryset.prefetch_related('week').prefetch_related('species').prefetch_related("hexagon")
 
         species = self.request.query_params.get('species')
-        week = self.request.query_params.get('week')
+        week = get_week_number(self.request)
+        viewport = get_viewport(self.request)
 
+        # the GiST index of the hexagons finds those whose bounding box overlaps the viewport
+        if viewport is not None:
+            queryset = queryset.filter(hexagon__polygon__bboverlaps=viewport)
+        queryset = filter_scores_by_area(queryset, get_area_filters(self.request))
         if species:
             queryset = queryset.filter(species__english_name=species)
         if week is not None:
@@ -118,39 +197,191 @@ class ScoreFeatureCombinedView(FisheriescapeAccessRequired, ListAPIView):
 
     # Cache the results
     def list(self, request, *args, **kwargs):
-        cache = caches.caches['default']
-        species = self.request.query_params.get('species')
-        week = self.request.query_params.get('week')
-        cache_key = f"ScoreFeatureViewSet:{species}_{week}".encode('utf-8')
-        hashed_cache_key = md5(cache_key).hexdigest()
-        cached_results = cache.get(hashed_cache_key)
-        if cached_results:
-            return Response(cached_results)
-        else:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            cache.set(hashed_cache_key, serializer.data)
-            return Response(serializer.data)
+        level = get_simplification_level_from_params(self.request.query_params)
+        species = self.request.query_params.getlist('species')
+        week = get_week_number(request)
+        viewport = get_viewport(request)
+        areas = get_area_filters(request)
 
-    def get_queryset(self):
-        queryset = self.queryset.prefetch_related('week').prefetch_related('species').prefetch_related("hexagon")
+        # let PostGIS render the whole feature collection
+        if self.request.query_params.get('render') == 'database':
+            precision = geojson.get_precision(self.request.query_params.get('precision'))
+            content = geojson.render_score_features_combined(species, week, precision=precision, level=level,
+                                                             viewport=viewport, areas=areas)
+            return HttpResponse(content, content_type="application/json")
 
-        species = self.request.query_params.getlist('species')
-        week = self.request.query_params.get('week')
+        if len(species) > 1:
+            score_cache.record_score_combination(species)
+
+        cache_key = score_cache.get_score_features_combined_cache_key(request.query_params, level, viewport)
+        return Response(score_cache.get_or_render(
+            cache_key, lambda: score_cache.serialize_score_features_combined(species, week, level, viewport, areas)))
 
+    def get_queryset(self):
+        return score_cache.get_combined_scores(self.request.query_params.getlist('species'),
+                                               get_week_number(self.request),
+                                               get_viewport(self.request), get_area_filters(self.request))
+
+
+class AreaScoreRollupView(FisheriescapeAccessRequired, APIView):
+    """
+    Scores of every fishery area (or NAFO area with `area_type=nafo_area`) for a `week`, from the hexagons overlapping
+    it weighted by the overlap: their weighted sum, or their weighted mean with `agg=mean`
+    """
+
+    def get(self, request):
+        try:
+            week = int(request.query_params.get("week"))
+        except (TypeError, ValueError):
+            raise ValidationError({"week": "A week number is required."})
+        area_type = request.query_params.get("area_type") or "fishery_area"
+        if area_type not in models.HexagonAreaOverlap.SOURCE_FIELDS.values():
+            raise ValidationError({"area_type": "Choose among fishery_area, nafo_area."})
+        agg = request.query_params.get("agg") or "sum"
+        if agg not in score_cache.AREA_ROLLUP_AGGREGATES:
+            raise ValidationError({"agg": f"Choose among {', '.join(score_cache.AREA_ROLLUP_AGGREGATES)}."})
+        species = sorted(set(request.query_params.getlist("species")))
+
+        cache_key = score_cache.get_api_cache_key("AreaScoreRollupView", score_cache.SCORES_DATASET,
+                                                  request.query_params)
+        return Response(score_cache.get_or_render(
+            cache_key, lambda: score_cache.get_area_score_rollup(species, week, area_type, agg)))
+
+
+class FisheryCalendarView(FisheriescapeAccessRequired, APIView):
+    """
+    Fisheries open during each week, with their species, gear and fishery areas. The dates of the weeks are moved to
+    another `year` when one is given.
+    """
+
+    def get(self, request):
+        try:
+            year = int(request.query_params["year"]) if request.query_params.get("year") else None
+        except ValueError:
+            raise ValidationError({"year": "The year must be a number."})
+        return Response(score_cache.get_fishery_calendar(year))
+
+
+class HexagonGeometryView(FisheriescapeAccessRequired, APIView):
+    """
+    GeoJSON of the whole hexagon grid, in the order of the score arrays. Requested with the current grid version, the
+    response never changes and may be kept by the browser for a year.
+    """
+    immutable_max_age = 60 * 60 * 24 * 365
+
+    def get(self, request):
+        level = get_simplification_level_from_params(request.query_params)
+        response = score_cache.payload_response(request, score_cache.get_hexagon_geometry(level))
+        if request.query_params.get("version") == str(score_cache.get_grid_version()):
+            patch_cache_control(response, private=True, max_age=self.immutable_max_age, immutable=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ScoreArrayView(FisheriescapeAccessRequired, APIView):
+    """
+    Site, ceu and fs scores of a species for a week, as arrays aligned to the hexagons of HexagonGeometryView. The
+    grid version they are aligned to is returned with them.
+    """
+
+    def get(self, request):
+        species = request.query_params.get("species")
+        try:
+            week = int(request.query_params.get("week"))
+        except (TypeError, ValueError):
+            raise ValidationError({"week": "A week number is required."})
+        if not species:
+            raise ValidationError({"species": "A species is required."})
+        return Response(score_cache.get_score_arrays(species, week))
+
+
+class ScoreSeasonView(FisheriescapeAccessRequired, APIView):
+    """
+    Scores of a species for every week of the season in one payload, aligned to the hexagons of HexagonGeometryView.
+    Only fs_score is sent unless other fields are asked for, e.g. `fields=fs_score,site_score`.
+    """
+
+    def get(self, request):
+        species = request.query_params.get("species")
+        if not species:
+            raise ValidationError({"species": "A species is required."})
+        fields = request.query_params.get("fields", "fs_score").split(",")
+        if not set(fields) <= set(bundles.SCORE_FIELDS):
+            raise ValidationError({"fields": f"Choose among {', '.join(bundles.SCORE_FIELDS)}."})
+        # a field asked for twice is sent once, in the order of the score fields
+        fields = [field for field in bundles.SCORE_FIELDS if field in fields]
+        return Response(score_cache.get_score_season(species, fields))
+
+
+class HexagonTimeseriesView(FisheriescapeAccessRequired, APIView):
+    """ Site, ceu and fs scores of a hexagon for every week, for the `species` given or for all of them """
+
+    def get(self, request, grid_id):
+        hexagon = get_object_or_404(models.Hexagon, grid_id=grid_id)
+        species = request.query_params.getlist("species")
+        return Response(score_cache.get_hexagon_timeseries(hexagon, species))
+
+
+class LocateView(FisheriescapeAccessRequired, APIView):
+    """
+    Hexagon, fishery areas and NAFO areas containing the `lat` and `lon` coordinate, found in memory. With a `week`,
+    the scores of the hexagon for every species that week and the fisheries of the fishery areas open that week are
+    added, the week dates being moved to another `year` when one is given.
+    """
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params.get("lat"))
+            lon = float(request.query_params.get("lon"))
+        except (TypeError, ValueError):
+            raise ValidationError({"lat": "lat and lon are required in degrees."})
+        try:
+            week = int(request.query_params["week"]) if request.query_params.get("week") else None
+            year = int(request.query_params["year"]) if request.query_params.get("year") else None
+        except ValueError:
+            raise ValidationError({"week": "The week and year must be numbers."})
+
+        location = spatial_index.locate_points([(lon, lat)])[0]
+        hexagon = models.Hexagon.objects.filter(pk=location["hexagon"]).values("id", "grid_id").first()
+        fishery_areas = models.FisheryArea.objects.filter(pk__in=location["fishery_areas"]).order_by("id")
+        nafo_areas = models.NAFOArea.objects.filter(pk__in=location["nafo_areas"]).order_by("id")
+        data = {
+            "lat": lat,
+            "lon": lon,
+            "hexagon": hexagon,
+            "fishery_areas": list(fishery_areas.values("id", "layer_id", "name")),
+            "nafo_areas": list(nafo_areas.values("id", "layer_id", "name")),
+        }
         if week is not None:
-            queryset = queryset.filter(week__week_number=week)
+            data["week"] = week
+            data["scores"] = bundles.render_hexagon_week_scores(hexagon["id"], week) if hexagon else []
+            data["fisheries"] = fisheries.get_week_fisheries(week, location["fishery_areas"], year)
+        return Response(data)
 
-        if species:
-            queryset = queryset.filter(species__english_name__in=species).values('hexagon', 'week').annotate(
-                fs_score=Sum("fs_score"),
-                species=StringAgg(
-                    'species__english_name', delimiter=','),
-                species_count=(Count("id")),
-                id=Sum('id')
-            ).order_by()
 
-        return queryset
+class ScoreTileView(FisheriescapeAccessRequired, APIView):
+    """ Mapbox vector tile of the hexagons of a tile with their scores for a species and a week """
+
+    def get(self, request, species, week, z, x, y):
+        if not tiles.is_valid_tile(z, x, y):
+            raise Http404
+        tile = score_cache.get_score_tile(species, week, z, x, y)
+        return HttpResponse(tile, content_type=tiles.MVT_CONTENT_TYPE)
+
+
+class MapLayerView(FisheriescapeAccessRequired, APIView):
+    """ GeoJSON of one of the polygon overlays of the score map, fetched when the overlay is toggled on """
+    # browsers may reuse an overlay for this long before revalidating it with its ETag
+    max_age = 60 * 60
+
+    def get(self, request, layer_id):
+        if layer_id not in layers.MAP_LAYERS:
+            raise Http404
+        level = get_simplification_level_from_params(request.query_params)
+        response = score_cache.payload_response(request, score_cache.get_map_layer(layer_id, level))
+        patch_cache_control(response, private=True, max_age=self.max_age)
+        return response
 
 
 class VulnerableSpeciesSpotsView(FisheriescapeAccessRequired, ListAPIView):
@@ -159,30 +390,54 @@ class VulnerableSpeciesSpotsView(FisheriescapeAccessRequired, ListAPIView):
 
     # Cache the results
     def list(self, request, *args, **kwargs):
-        cache = caches.caches['default']
-        vulnerable_species = self.request.query_params.get('vulnerable_species')
-        week = self.request.query_params.get('week')
-        cache_key = f"VulnerableSpeciesSpotsView:{vulnerable_species}_{week}".encode('utf-8')
-        hashed_cache_key = md5(cache_key).hexdigest()
-        cached_results = cache.get(hashed_cache_key)
-        if cached_results:
-            return Response(cached_results)
-        else:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            cache.set(hashed_cache_key, serializer.data)
-            return Response(serializer.data)
+        # the same species in any order share an entry
+        extra = {
+            "bbox": get_viewport_key(get_viewport(request)),
+            "vulnerable_species": ",".join(sorted(set(self.get_vulnerable_species() or []))),
+        }
+        render = self.render_spots
+        if request.query_params.get("cluster") == "true":
+            zoom, method = self.get_cluster_params()
+            extra.update(zoom=zoom, method=method)
+            render = lambda: self.render_clusters(zoom, method)
+        cache_key = score_cache.get_api_cache_key("VulnerableSpeciesSpotsView",
+                                                  score_cache.VULNERABLE_SPECIES_SPOTS_DATASET, request.query_params,
+                                                  ignore=VIEWPORT_PARAMS + ("vulnerable_species",), **extra)
+        return Response(score_cache.get_or_render(cache_key, render))
+
+    def get_vulnerable_species(self):
+        if self.request.query_params.get('vulnerable_species'):
+            return self.request.query_params.get('vulnerable_species').split(',')
+        return None
+
+    def get_cluster_params(self):
+        """ Zoom and method of `cluster=true` requests: the spots are aggregated into clusters sized for the zoom """
+        try:
+            zoom = int(self.request.query_params.get("zoom") or 0)
+        except ValueError:
+            raise ValidationError({"zoom": "The zoom must be a number."})
+        method = self.request.query_params.get("method") or "grid"
+        if method not in clusters.CLUSTER_METHODS:
+            raise ValidationError({"method": f"Choose among {', '.join(clusters.CLUSTER_METHODS)}."})
+        return zoom, method
+
+    def render_spots(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_serializer(queryset, many=True).data
+
+    def render_clusters(self, zoom, method):
+        return clusters.render_spot_clusters(self.filter_queryset(self.get_queryset()), zoom, method)
 
     def get_queryset(self):
         queryset = self.queryset.prefetch_related('week').prefetch_related('vulnerable_species')
 
-        if self.request.query_params.get('vulnerable_species'):
-            vulnerable_species = self.request.query_params.get('vulnerable_species').split(',')
-        else :
-            vulnerable_species = None
+        vulnerable_species = self.get_vulnerable_species()
         week = self.request.query_params.get('week')
+        viewport = get_viewport(self.request)
 
         # custom filters by field
+        if viewport is not None:
+            queryset = queryset.filter(point__bboverlaps=flip_viewport(viewport))
         if vulnerable_species:
             queryset = queryset.filter(vulnerable_species__english_name__in=vulnerable_species)
         if week is not None:
@@ -191,6 +446,15 @@ class VulnerableSpeciesSpotsView(FisheriescapeAccessRequired, ListAPIView):
         return queryset
 
 
+# IMPORTS
+##########
+
+class ImportJobView(FisheriescapeAdminAccessRequired, RetrieveAPIView):
+    """ Progress of a background import, polled by the import pages """
+    queryset = models.ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+
+
 # LOOKUPS
 ##########
 
@@ -204,6 +468,34 @@ class VulnerableSpeciesView(FisheriescapeAccessRequired, ListAPIView):
     serializer_class = VulnerableSpeciesSerializer
 
 
+class CacheWarmingView(FisheriescapeAdminAccessRequired, APIView):
+    """ Progress and timing of the last cache warming job """
+
+    def get(self, request):
+        return Response(score_cache.get_cache_warming_status())
+
+
+class SpeciesScoreStatsView(FisheriescapeAccessRequired, ListAPIView):
+    """ Score distribution of species, for a week or for the whole season when no week is given. Used for legends. """
+    queryset = models.SpeciesScoreStats.objects.all()
+    serializer_class = SpeciesScoreStatsSerializer
+
+    def get_queryset(self):
+        queryset = self.queryset.select_related('species', 'week')
+
+        species = self.request.query_params.getlist('species')
+        week = self.request.query_params.get('week')
+
+        if species:
+            queryset = queryset.filter(species__english_name__in=species)
+        if week:
+            queryset = queryset.filter(week__week_number=week)
+        else:
+            queryset = queryset.filter(week__isnull=True)
+
+        return queryset
+
+
 class WeekListAPIView(ListAPIView):
     queryset = models.Week.objects.all()
     serializer_class = WeekSerializer
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class FisheriescapeConfig(AppConfig):
     name = 'fisheriescape'
+
+    def ready(self):
+        # connect the cache invalidation receivers
+        from . import signals  # noqa: F401
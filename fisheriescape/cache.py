@@ -0,0 +1,533 @@
+import gzip
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.core.cache import caches
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Max, Min, Sum
+from django.http import HttpResponse, QueryDict
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from . import models
+from .api.serializers import ScoreFeatureCombinedSerializer, ScoreFeatureSerializer, ScoreFeatureWeekRangeSerializer
+from .api import bundles, fisheries
+from .api.layers import MAP_LAYERS, render_map_layer
+from .api.tiles import render_score_tile
+from .utils import SIMPLIFICATION_PARAMS, VIEWPORT_PARAMS, filter_scores_by_area, get_viewport_key, \
+    use_simplified_polygons
+
+# Score features are only modified by imports, so the rendered GeoJSON of every (species, week) pair is dropped by
+# the importers. Its key also holds the generation of the score references: the payloads retired by an edit of a
+# species, week or hexagon are left to expire.
+SCORE_FEATURES_CACHE_PREFIX = "ScoreFeatures"
+# Vector tiles are keyed on a version of their (species, week) pair which the importers drop, so that every tile of a
+# pair is invalidated at once. Tiles of dropped versions and unused versions are left to expire.
+SCORE_TILES_CACHE_PREFIX = "ScoreTiles"
+SCORE_TILES_TIMEOUT = 60 * 60 * 24 * 7
+# The map overlays are keyed on the generation of their dataset, bumped when a FisheryArea or NAFOArea is saved or
+# deleted.
+MAP_LAYERS_CACHE_PREFIX = "MapLayers"
+# Responses of the API views are keyed on the generation of the dataset they are built from. Bumping a generation
+# retires every key of the dataset at once and the entries of older generations are left to expire.
+GENERATION_CACHE_PREFIX = "Generation"
+API_CACHE_PREFIX = "Api"
+API_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+SCORES_DATASET = "scores"
+# species, weeks and hexagons the scores refer to, also part of the keys of the stored payloads and vector tiles
+SCORE_REFERENCES_DATASET = "score_references"
+VULNERABLE_SPECIES_SPOTS_DATASET = "vulnerable_species_spots"
+MAP_LAYERS_DATASET = "map_layers"
+# fisheries, with their species, weeks and fishery areas
+FISHERIES_DATASET = "fisheries"
+
+# aggregates of the scores of each hexagon over a range of weeks
+WEEK_RANGE_AGGREGATES = {"mean": Avg, "max": Max, "sum": Sum}
+# aggregates of the scores of the hexagons overlapping an area, weighted by the overlap
+AREA_ROLLUP_AGGREGATES = ("sum", "mean")
+
+# The hexagon grid is keyed on its version, the generation of the score references
+HEXAGON_GRID_CACHE_PREFIX = "HexagonGrid"
+
+# number of requests of each species combination of ScoreFeatureCombinedView, used to pick the ones to warm
+SCORE_COMBINATIONS_KEY = "ScoreCombinations"
+SCORE_COMBINATIONS_SIZE = 100
+# progress and timing of the last cache warming job
+CACHE_WARMING_STATUS_KEY = "CacheWarming:status"
+
+
+def get_cache():
+    return caches['default']
+
+
+def get_generation_key(dataset):
+    return f"{GENERATION_CACHE_PREFIX}:{dataset}"
+
+
+def get_generation(dataset) -> int:
+    """
+    Current generation of a dataset. Counters start from the current time in milliseconds, so that a counter lost
+    by the cache never goes back to a generation used before.
+    """
+    return get_cache().get_or_set(
+        get_generation_key(dataset), lambda: int(timezone.now().timestamp() * 1000), timeout=None)
+
+
+def bump_generation(dataset) -> int:
+    """ Retire every cached response built from a dataset """
+    try:
+        return get_cache().incr(get_generation_key(dataset))
+    except ValueError:
+        # no counter yet: a new one is more recent than any generation used before
+        return get_generation(dataset)
+
+
+def normalize_query_params(query_params, ignore=()) -> str:
+    """ Query parameters as a canonical string: sorted names and values, without blank values """
+    items = []
+    for name in sorted(query_params):
+        if name in ignore:
+            continue
+        items += [(name, value) for value in sorted(query_params.getlist(name)) if value != ""]
+    return urlencode(items)
+
+
+def get_api_cache_key(namespace, dataset, query_params, ignore=(), **extra):
+    """
+    Cache key of an API response built from the current generation of a dataset, for a view namespace and its
+    normalized query parameters. Values derived from ignored parameters can be passed as extra keyword arguments.
+    """
+    query = normalize_query_params(query_params, ignore)
+    if extra:
+        query += "#" + urlencode(sorted(extra.items()))
+    cache_key = f"{API_CACHE_PREFIX}:{namespace}:{get_generation(dataset)}:{query}".encode('utf-8')
+    return md5(cache_key).hexdigest()
+
+
+def get_or_render(cache_key, render):
+    """ Return the data cached under a key, rendering and caching it on a miss """
+    cache = get_cache()
+    data = cache.get(cache_key)
+    if data is None:
+        data = render()
+        cache.set(cache_key, data, timeout=API_CACHE_TIMEOUT)
+    return data
+
+
+def get_score_features_cache_key(species_name, week_number, level=None):
+    generation = get_generation(SCORE_REFERENCES_DATASET)
+    cache_key = f"{SCORE_FEATURES_CACHE_PREFIX}:{generation}:{species_name}_{week_number}".encode('utf-8')
+    if level is not None:
+        # payloads of simplified hexagons are stored next to the full one
+        cache_key += f":{level}".encode('utf-8')
+    return md5(cache_key).hexdigest()
+
+
+def render_score_features(species_name, week_number, level=None) -> bytes:
+    """
+    Render the ScoreFeatureView GeoJSON FeatureCollection for a species and a week, with the hexagons simplified at
+    a SimplifiedPolygon level when one is given
+    """
+    scores = list(models.Score.objects.select_related("hexagon", "species", "week").filter(
+        species__english_name=species_name,
+        week__week_number=week_number,
+    ))
+    use_simplified_polygons([score.hexagon for score in scores], level)
+    serializer = ScoreFeatureSerializer(scores, many=True)
+    return JSONRenderer().render(serializer.data)
+
+
+def build_payload(content: bytes) -> dict:
+    """ Compress rendered json and compute the validators used for conditional requests """
+    return {
+        "content": gzip.compress(content),
+        "etag": quote_etag(md5(content).hexdigest()),
+        "last_modified": int(timezone.now().timestamp()),
+    }
+
+
+def store_score_features(species_name, week_number, level=None) -> dict:
+    payload = build_payload(render_score_features(species_name, week_number, level))
+    get_cache().set(get_score_features_cache_key(species_name, week_number, level), payload,
+                    timeout=API_CACHE_TIMEOUT)
+    return payload
+
+
+def species_week_exists(species_name, week_number) -> bool:
+    """ Whether a species and a week sent in a request exist, before anything is cached for them """
+    return models.Species.objects.filter(english_name=species_name).exists() and \
+        models.Week.objects.filter(week_number=week_number).exists()
+
+
+def get_score_features(species_name, week_number, level=None) -> dict:
+    """
+    Return the stored payload for a species and a week, rendering it on a cache miss. Payloads are only stored for
+    an existing species and week, so that arbitrary query strings cannot fill the cache.
+    """
+    payload = get_cache().get(get_score_features_cache_key(species_name, week_number, level))
+    if payload is None:
+        if species_week_exists(species_name, week_number):
+            payload = store_score_features(species_name, week_number, level)
+        else:
+            # an empty feature collection
+            payload = build_payload(render_score_features(species_name, week_number, level))
+    return payload
+
+
+def get_species_week_names(species_weeks):
+    """ Translate (species id, week id) pairs into the (english name, week number) pairs used in cache keys """
+    species_weeks = list(species_weeks)
+    species_names = dict(models.Species.objects.filter(
+        id__in={species_id for species_id, week_id in species_weeks}).values_list("id", "english_name"))
+    week_numbers = dict(models.Week.objects.filter(
+        id__in={week_id for species_id, week_id in species_weeks}).values_list("id", "week_number"))
+    return [(species_names[species_id], week_numbers[week_id]) for species_id, week_id in species_weeks]
+
+
+def invalidate_score_features(species_weeks):
+    """ Drop the stored payloads and vector tiles of the given (species id, week id) pairs """
+    species_week_names = get_species_week_names(species_weeks)
+    levels = [None, *models.SimplifiedPolygon.TOLERANCES]
+    get_cache().delete_many([
+        get_score_features_cache_key(species_name, week_number, level)
+        for species_name, week_number in species_week_names
+        for level in levels
+    ] + [
+        get_score_tiles_version_key(species_name, week_number)
+        for species_name, week_number in species_week_names
+    ])
+
+
+def invalidate_scores(species_weeks=()):
+    """
+    Retire the cached responses built from the scores, along with the stored payloads and vector tiles of the given
+    (species id, week id) pairs
+    """
+    if species_weeks:
+        invalidate_score_features(species_weeks)
+    bump_generation(SCORES_DATASET)
+
+
+def invalidate_score_references():
+    """ Retire everything built from the scores, for an edit of the species, weeks or hexagons they refer to """
+    bump_generation(SCORE_REFERENCES_DATASET)
+    bump_generation(SCORES_DATASET)
+
+
+def get_score_tiles_version_key(species_name, week_number):
+    cache_key = f"{SCORE_TILES_CACHE_PREFIX}:version:{species_name}_{week_number}".encode('utf-8')
+    return md5(cache_key).hexdigest()
+
+
+def get_score_tile_cache_key(species_name, week_number, z, x, y):
+    version_key = get_score_tiles_version_key(species_name, week_number)
+    version = get_cache().get_or_set(version_key, lambda: timezone.now().timestamp(), timeout=SCORE_TILES_TIMEOUT)
+    generation = get_generation(SCORE_REFERENCES_DATASET)
+    cache_key = f"{SCORE_TILES_CACHE_PREFIX}:{generation}:{version}:{species_name}_{week_number}_{z}_{x}_{y}".encode(
+        'utf-8')
+    return md5(cache_key).hexdigest()
+
+
+def get_score_tile(species_name, week_number, z, x, y) -> bytes:
+    """
+    Return the vector tile of a species and a week, rendering it on a cache miss. Tiles are only cached for an
+    existing species and week, so that arbitrary urls cannot fill the cache: the tiles of any other pair are empty.
+    """
+    cache = get_cache()
+    # a pair with a tiles version has been checked already
+    if cache.get(get_score_tiles_version_key(species_name, week_number)) is None and \
+            not species_week_exists(species_name, week_number):
+        return b""
+    cache_key = get_score_tile_cache_key(species_name, week_number, z, x, y)
+    tile = cache.get(cache_key)
+    if tile is None:
+        tile = render_score_tile(species_name, week_number, z, x, y)
+        cache.set(cache_key, tile, timeout=SCORE_TILES_TIMEOUT)
+    return tile
+
+
+def payload_response(request, payload: dict) -> HttpResponse:
+    """
+    Serve a stored payload as is: compressed when the client accepts gzip, and as a 304 when the client copy is
+    still valid.
+    """
+    response = get_conditional_response(request, etag=payload["etag"], last_modified=payload["last_modified"])
+    if response is None:
+        if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+            response = HttpResponse(payload["content"], content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(gzip.decompress(payload["content"]), content_type="application/json")
+    response["ETag"] = payload["etag"]
+    response["Last-Modified"] = http_date(payload["last_modified"])
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def get_map_layer_cache_key(layer_id, level=None):
+    generation = get_generation(MAP_LAYERS_DATASET)
+    cache_key = f"{MAP_LAYERS_CACHE_PREFIX}:{generation}:{layer_id}_{level}".encode('utf-8')
+    return md5(cache_key).hexdigest()
+
+
+def store_map_layer(layer_id, level=None) -> dict:
+    payload = build_payload(render_map_layer(layer_id, level))
+    get_cache().set(get_map_layer_cache_key(layer_id, level), payload, timeout=API_CACHE_TIMEOUT)
+    return payload
+
+
+def get_map_layer(layer_id, level=None) -> dict:
+    """ Return the stored payload of a map overlay, rendering it on a cache miss """
+    payload = get_cache().get(get_map_layer_cache_key(layer_id, level))
+    if payload is None:
+        payload = store_map_layer(layer_id, level)
+    return payload
+
+
+def invalidate_map_layers():
+    """ Retire the stored payloads of every map overlay at every simplification level """
+    bump_generation(MAP_LAYERS_DATASET)
+
+
+def build_map_layers():
+    """ Render and store the payloads of every map overlay at every simplification level """
+    for layer_id in MAP_LAYERS:
+        for level in [None, *models.SimplifiedPolygon.TOLERANCES]:
+            store_map_layer(layer_id, level)
+
+
+def get_combined_scores(species_names, week_number, viewport=None, areas=None):
+    """
+    Scores of ScoreFeatureCombinedView: one row per hexagon and week, with the fs scores of the species summed.
+    A viewport polygon limits them to the hexagons whose bounding box overlaps it, and areas to the hexagons
+    overlapping them.
+    """
+    queryset = filter_scores_by_area(models.Score.objects.all(), areas)
+    if viewport is not None:
+        queryset = queryset.filter(hexagon__polygon__bboverlaps=viewport)
+    if week_number is not None:
+        queryset = queryset.filter(week__week_number=week_number)
+    if species_names:
+        queryset = queryset.filter(species__english_name__in=species_names)
+
+    return queryset.values('hexagon', 'week').annotate(
+        fs_score=Sum("fs_score"),
+        species=StringAgg(
+            'species__english_name', delimiter=','),
+        species_count=(Count("id")),
+        id=Sum('id')
+    ).order_by()
+
+
+def get_spot_densities(scores, vulnerable_species_names=None) -> dict:
+    """
+    Vulnerable species spots of the hexagon and week of each score, summed over the given vulnerable species or all of
+    them, keyed by (hexagon id, week id)
+    """
+    densities = models.HexagonSpotDensity.objects.filter(
+        hexagon__in={score.hexagon_id for score in scores},
+        week__in={score.week_id for score in scores},
+    )
+    if vulnerable_species_names:
+        densities = densities.filter(vulnerable_species__english_name__in=vulnerable_species_names)
+    densities = densities.values("hexagon", "week").annotate(
+        spot_total_count=Sum("total_count"),
+        spot_sighting_count=Sum("sighting_count"),
+    ).order_by()
+    return {(density.pop("hexagon"), density.pop("week")): density for density in densities}
+
+
+def serialize_score_features_combined(species_names, week_number, level=None, viewport=None, areas=None):
+    """ Serialized ScoreFeatureCombinedView FeatureCollection for a list of species and a week """
+    scores = list(get_combined_scores(species_names, week_number, viewport, areas))
+    # a single query for the geometry and grid id of every hexagon instead of two per feature
+    hexagons = models.Hexagon.objects.only("grid_id", "polygon").in_bulk(
+        {score.get('hexagon') for score in scores})
+    use_simplified_polygons(hexagons.values(), level)
+    return ScoreFeatureCombinedSerializer(scores, many=True, context={"hexagons": hexagons}).data
+
+
+def get_week_range_scores(species_names, week_from, week_to, agg, viewport=None, areas=None):
+    """ Scores of each hexagon aggregated over a range of weeks, for the given species or for all of them """
+    aggregate = WEEK_RANGE_AGGREGATES[agg]
+    queryset = filter_scores_by_area(models.Score.objects.all(), areas)
+    queryset = queryset.filter(week__week_number__gte=week_from, week__week_number__lte=week_to)
+    if viewport is not None:
+        queryset = queryset.filter(hexagon__polygon__bboverlaps=viewport)
+    if species_names:
+        queryset = queryset.filter(species__english_name__in=species_names)
+
+    return queryset.values('hexagon').annotate(
+        site_score=aggregate("site_score", output_field=FloatField()),
+        ceu_score=aggregate("ceu_score", output_field=FloatField()),
+        fs_score=aggregate("fs_score", output_field=FloatField()),
+        species=StringAgg('species__english_name', delimiter=',', distinct=True),
+        species_count=Count("species", distinct=True),
+        week_count=Count("week", distinct=True),
+        id=Min('id'),
+    ).order_by()
+
+
+def serialize_score_features_week_range(species_names, week_from, week_to, agg, level=None, viewport=None,
+                                        areas=None):
+    """ Serialized FeatureCollection of the scores of each hexagon aggregated over a range of weeks """
+    scores = list(get_week_range_scores(species_names, week_from, week_to, agg, viewport, areas))
+    hexagons = models.Hexagon.objects.only("grid_id", "polygon").in_bulk(
+        {score.get('hexagon') for score in scores})
+    use_simplified_polygons(hexagons.values(), level)
+    context = {"hexagons": hexagons, "weeks": f"Weeks {week_from} to {week_to} ({agg})"}
+    return ScoreFeatureWeekRangeSerializer(scores, many=True, context=context).data
+
+
+def get_score_features_week_range(species_names, week_from, week_to, agg, level=None, viewport=None, areas=None):
+    """ Scores aggregated over a range of weeks, rendered on a cache miss """
+    query_params = QueryDict(mutable=True)
+    query_params.setlist("species", list(species_names))
+    query_params.update({"week_from": str(week_from), "week_to": str(week_to), "agg": agg})
+    query_params.update({field: str(area_id) for field, area_id in (areas or {}).items()})
+    cache_key = get_api_cache_key("ScoreFeatureWeekRange", SCORES_DATASET, query_params, level=level,
+                                  bbox=get_viewport_key(viewport))
+    return get_or_render(cache_key, lambda: serialize_score_features_week_range(
+        species_names, week_from, week_to, agg, level, viewport, areas))
+
+
+def get_area_score_rollup(species_names, week_number, area_field, agg) -> list:
+    """
+    Scores of every fishery or NAFO area for a week, from the scores of the hexagons overlapping it weighted by their
+    overlap fraction: the weighted sum of the scores, or their weighted mean
+    """
+    overlap = "hexagon__area_overlaps"
+    queryset = models.Score.objects.filter(**{f"{overlap}__{area_field}__isnull": False},
+                                           week__week_number=week_number)
+    if species_names:
+        queryset = queryset.filter(species__english_name__in=species_names)
+
+    def weighted(field):
+        weighted_sum = Sum(ExpressionWrapper(F(field) * F(f"{overlap}__fraction"), output_field=FloatField()))
+        if agg == "mean":
+            return weighted_sum / Sum(f"{overlap}__fraction", output_field=FloatField())
+        return weighted_sum
+
+    rows = list(queryset.values(area=F(f"{overlap}__{area_field}")).annotate(
+        site_score=weighted("site_score"),
+        ceu_score=weighted("ceu_score"),
+        fs_score=weighted("fs_score"),
+        hexagon_count=Count("hexagon", distinct=True),
+    ).order_by("area"))
+    area_model = models.HexagonAreaOverlap._meta.get_field(area_field).related_model
+    areas = area_model.objects.only("layer_id", "name").in_bulk({row["area"] for row in rows})
+    rollup = []
+    for row in rows:
+        area = areas[row.pop("area")]
+        rollup.append({"id": area.id, "layer_id": area.layer_id, "name": area.name, **row})
+    return rollup
+
+
+def get_score_features_combined_cache_key(query_params, level=None, viewport=None):
+    # the raw bbox is replaced by the snapped viewport so that nearby viewports share an entry
+    return get_api_cache_key("ScoreFeatureCombinedView", SCORES_DATASET, query_params,
+                             ignore=SIMPLIFICATION_PARAMS + VIEWPORT_PARAMS, level=level,
+                             bbox=get_viewport_key(viewport))
+
+
+def record_score_combination(species_names):
+    """
+    Count a request of a combination of species. Concurrent requests may lose a count, which is good enough to tell
+    the popular combinations apart.
+    """
+    cache = get_cache()
+    combinations = cache.get(SCORE_COMBINATIONS_KEY) or {}
+    combination = ",".join(sorted(species_names))
+    combinations[combination] = combinations.get(combination, 0) + 1
+    if len(combinations) > SCORE_COMBINATIONS_SIZE:
+        # forget the least requested combinations
+        combinations = dict(sorted(combinations.items(), key=lambda item: -item[1])[:SCORE_COMBINATIONS_SIZE])
+    cache.set(SCORE_COMBINATIONS_KEY, combinations, timeout=None)
+
+
+def get_popular_score_combinations(count) -> list:
+    """ The most requested combinations of species, as lists of english names """
+    combinations = get_cache().get(SCORE_COMBINATIONS_KEY) or {}
+    popular = sorted(combinations.items(), key=lambda item: -item[1])[:count]
+    return [combination.split(",") for combination, requests in popular]
+
+
+def store_score_features_combined(species_names, week_number):
+    """ Render the ScoreFeatureCombinedView response of a list of species and a week into the cache """
+    query_params = QueryDict(mutable=True)
+    query_params.setlist("species", species_names)
+    query_params["week"] = str(week_number)
+    get_cache().set(get_score_features_combined_cache_key(query_params),
+                    serialize_score_features_combined(species_names, week_number), timeout=API_CACHE_TIMEOUT)
+
+
+def set_cache_warming_status(status: dict):
+    get_cache().set(CACHE_WARMING_STATUS_KEY, status, timeout=None)
+
+
+def get_cache_warming_status() -> dict:
+    return get_cache().get(CACHE_WARMING_STATUS_KEY) or {"status": "never run"}
+
+
+def get_grid_version() -> int:
+    """ Version of the hexagon grid and of its order, which changes with any edit of the hexagons """
+    return get_generation(SCORE_REFERENCES_DATASET)
+
+
+def get_hexagon_geometry(level=None) -> dict:
+    """ Return the stored payload of the hexagon grid, rendering it on a cache miss """
+    cache = get_cache()
+    cache_key = md5(f"{HEXAGON_GRID_CACHE_PREFIX}:{get_grid_version()}:geometry_{level}".encode('utf-8')).hexdigest()
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = build_payload(bundles.render_hexagon_geometry(level))
+        cache.set(cache_key, payload, timeout=API_CACHE_TIMEOUT)
+    return payload
+
+
+def get_hexagon_ids() -> list:
+    cache_key = md5(f"{HEXAGON_GRID_CACHE_PREFIX}:{get_grid_version()}:ids".encode('utf-8')).hexdigest()
+    return get_or_render(cache_key, bundles.get_hexagon_ids)
+
+
+def get_score_arrays(species_name, week_number) -> dict:
+    """ Scores of a species for a week aligned to the hexagon grid, rendered on a cache miss """
+    query_params = QueryDict(mutable=True)
+    query_params.update({"species": species_name, "week": str(week_number)})
+    grid_version = get_grid_version()
+    cache_key = get_api_cache_key("ScoreArrays", SCORES_DATASET, query_params, grid_version=grid_version)
+    return get_or_render(cache_key, lambda: {
+        **bundles.render_score_arrays(get_hexagon_ids(), species_name, week_number),
+        "grid_version": grid_version,
+    })
+
+
+def get_score_season(species_name, fields) -> dict:
+    """ Season bundle of a species, rendered on a cache miss """
+    query_params = QueryDict(mutable=True)
+    query_params["species"] = species_name
+    query_params.setlist("fields", list(fields))
+    grid_version = get_grid_version()
+    cache_key = get_api_cache_key("ScoreSeason", SCORES_DATASET, query_params, grid_version=grid_version)
+    return get_or_render(cache_key, lambda: {
+        **bundles.render_score_season(get_hexagon_ids(), species_name, fields),
+        "grid_version": grid_version,
+    })
+
+
+def get_hexagon_timeseries(hexagon, species_names) -> dict:
+    """ Season of the scores of a hexagon, rendered on a cache miss """
+    query_params = QueryDict(mutable=True)
+    query_params["grid_id"] = hexagon.grid_id
+    query_params.setlist("species", list(species_names))
+    cache_key = get_api_cache_key("HexagonTimeseries", SCORES_DATASET, query_params)
+    return get_or_render(cache_key, lambda: bundles.render_hexagon_timeseries(hexagon, species_names))
+
+
+def get_fishery_calendar(year=None) -> list:
+    """ Fisheries open during each week, rendered on a cache miss """
+    cache_key = get_api_cache_key("FisheryCalendar", FISHERIES_DATASET, QueryDict(), year=year)
+    return get_or_render(cache_key, lambda: fisheries.render_fishery_calendar(year))
@@ -0,0 +1,30 @@
+from django.contrib.gis.db.models.functions import GeoFunc
+from django.db.models import Aggregate, FloatField, Value
+
+
+class PercentileCont(Aggregate):
+    """ PostgreSQL continuous percentile: percentile_cont(fraction) WITHIN GROUP (ORDER BY expression) """
+    function = "percentile_cont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+class SimplifyPreserveTopology(GeoFunc):
+    """ PostGIS ST_SimplifyPreserveTopology(geometry, tolerance) """
+    function = "ST_SimplifyPreserveTopology"
+
+    def __init__(self, expression, tolerance, **extra):
+        super().__init__(expression, Value(float(tolerance)), **extra)
+
+
+class Multi(GeoFunc):
+    """ PostGIS ST_Multi(geometry), so that simplified polygons still fit MultiPolygonFields """
+    function = "ST_Multi"
+
+
+class FlipCoordinates(GeoFunc):
+    """ PostGIS ST_FlipCoordinates(geometry), for the spots stored as (lat, lon) points """
+    function = "ST_FlipCoordinates"
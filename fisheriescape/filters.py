@@ -1,6 +1,5 @@
 import django_filters
 from django import forms
-from django.db.models import Q
 
 from . import models
 from django.utils.translation import gettext as _
@@ -62,9 +61,8 @@ class FisheryFilter(django_filters.FilterSet):
         # }
 
     def date_filter(self, queryset, name, value):
-        return models.Fishery.objects.filter(
-            Q(start_date__lte=value) & Q(end_date__gte=value)
-        )
+        # the GiST index of the season range finds the fisheries open on that date
+        return queryset.filter(season__contains=value)
 
     # TODO this doesn't currently work; and make date the first thing in the list
     def __init__(self, *args, **kwargs):
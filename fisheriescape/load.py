@@ -8,7 +8,9 @@ import os
 
 from django.contrib.gis.utils import LayerMapping
 
-from .models import FisheryArea, Hexagon, Score, NAFOArea
+from .cache import build_map_layers, invalidate_map_layers, invalidate_score_references, invalidate_scores
+from .models import FisheryArea, Hexagon, HexagonAreaOverlap, Score, NAFOArea, SimplifiedPolygon
+from .scripts import refresh_hexagon_spot_densities
 
 # For NAFO_select.shp
 nafo_select_shp_mapping = {
@@ -148,6 +150,26 @@ def site_score_shp_run(verbose=True):
     lm.save(strict=True, verbose=verbose)
 
 
+# Simplified copies of the polygons served to maps drawn at low zooms
+def simplified_polygons_run(verbose=True):
+    for model in (NAFOArea, FisheryArea, Hexagon):
+        SimplifiedPolygon.build(model.objects.all())
+        if verbose:
+            print(f'Simplified {model._meta.verbose_name_plural}')
+    # everything built from the hexagons and the areas is rendered again with the new polygons
+    invalidate_score_references()
+    invalidate_map_layers()
+
+
+# Overlaps of the hexagons with the fishery and NAFO areas, used to filter and roll up the scores by area
+def area_overlaps_run(verbose=True):
+    for model in (NAFOArea, FisheryArea):
+        HexagonAreaOverlap.build(model.objects.all())
+        if verbose:
+            print(f'Overlapped {model._meta.verbose_name_plural} with the hexagons')
+    invalidate_scores()
+
+
 def run():
     try:
         print('Import nafo_select_shp ...')
@@ -205,3 +227,31 @@ def run():
         print('✅ site_score_shp imported')
     except Exception as e:
         print(f'❌ site_score_shp import failed : {e}')
+
+    try:
+        print('Simplify polygons ...')
+        simplified_polygons_run()
+        print('✅ polygons simplified')
+    except Exception as e:
+        print(f'❌ polygon simplification failed : {e}')
+
+    try:
+        print('Overlap areas with hexagons ...')
+        area_overlaps_run()
+        print('✅ area overlaps built')
+    except Exception as e:
+        print(f'❌ area overlaps build failed : {e}')
+
+    try:
+        print('Build hexagon spot densities ...')
+        refresh_hexagon_spot_densities()
+        print('✅ hexagon spot densities built')
+    except Exception as e:
+        print(f'❌ hexagon spot densities build failed : {e}')
+
+    try:
+        print('Build map layers ...')
+        build_map_layers()
+        print('✅ map layers built')
+    except Exception as e:
+        print(f'❌ map layers build failed : {e}')
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fisheriescape import models, views
+from lib.templatetags import verbose_names
+
+
+def render_table(objects, field_names, compiled=True):
+    """ Cells of a list table as rendered by verbose_td_display, parsing every field spec again when not compiled """
+    rows = list()
+    for obj in objects:
+        cells = list()
+        for field_name in field_names:
+            if not compiled:
+                # what every cell cost before the plans were kept
+                verbose_names.FIELD_PLANS.clear()
+            cells.append(verbose_names.verbose_td_display(obj, field_name))
+        rows.append(cells)
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Time the rendering of a fishery list table with and without the compiled field plans of verbose_names"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="number of rows of the table")
+
+    def handle(self, *args, **options):
+        # unsaved rows, so that only the rendering is timed
+        species = models.Species(english_name="Benchmark species")
+        fisheries = [
+            models.Fishery(id=i, species=species, start_date=timezone.now(), participants=i, fishery_status="Active")
+            for i in range(options["rows"])
+        ]
+        field_names = [field["name"] for field in views.FisheryListView.field_list if field["name"] != "fishery_areas"]
+
+        start = time.perf_counter()
+        render_table(fisheries, field_names, compiled=False)
+        uncompiled_time = time.perf_counter() - start
+
+        verbose_names.FIELD_PLANS.clear()
+        start = time.perf_counter()
+        render_table(fisheries, field_names)
+        compiled_time = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{options['rows']:,} rows x {len(field_names)} columns: {uncompiled_time:.3f}s parsing each cell, "
+            f"{compiled_time:.3f}s with compiled field plans ({uncompiled_time / compiled_time:.1f}x)")
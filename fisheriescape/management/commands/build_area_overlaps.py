@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from fisheriescape.load import area_overlaps_run
+
+
+class Command(BaseCommand):
+    help = "Overlap the fishery and NAFO areas with the hexagon grid, for the area filters and rollups of the scores"
+
+    def handle(self, *args, **options):
+        area_overlaps_run(verbose=options["verbosity"] > 0)
+        self.stdout.write(self.style.SUCCESS("Area overlaps built"))
@@ -0,0 +1,140 @@
+# Generated by Django 4.1.6 on 2026-10-18 10:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0009_importjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpeciesScoreStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "score_count",
+                    models.IntegerField(default=0, verbose_name="number of scores"),
+                ),
+                (
+                    "site_score_min",
+                    models.FloatField(blank=True, null=True, verbose_name="site score min"),
+                ),
+                (
+                    "site_score_max",
+                    models.FloatField(blank=True, null=True, verbose_name="site score max"),
+                ),
+                (
+                    "site_score_mean",
+                    models.FloatField(blank=True, null=True, verbose_name="site score mean"),
+                ),
+                (
+                    "site_score_p25",
+                    models.FloatField(blank=True, null=True, verbose_name="site score 25th percentile"),
+                ),
+                (
+                    "site_score_p50",
+                    models.FloatField(blank=True, null=True, verbose_name="site score median"),
+                ),
+                (
+                    "site_score_p75",
+                    models.FloatField(blank=True, null=True, verbose_name="site score 75th percentile"),
+                ),
+                (
+                    "site_score_p90",
+                    models.FloatField(blank=True, null=True, verbose_name="site score 90th percentile"),
+                ),
+                (
+                    "ceu_score_min",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score min"),
+                ),
+                (
+                    "ceu_score_max",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score max"),
+                ),
+                (
+                    "ceu_score_mean",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score mean"),
+                ),
+                (
+                    "ceu_score_p25",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score 25th percentile"),
+                ),
+                (
+                    "ceu_score_p50",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score median"),
+                ),
+                (
+                    "ceu_score_p75",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score 75th percentile"),
+                ),
+                (
+                    "ceu_score_p90",
+                    models.FloatField(blank=True, null=True, verbose_name="ceu score 90th percentile"),
+                ),
+                (
+                    "fs_score_min",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score min"),
+                ),
+                (
+                    "fs_score_max",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score max"),
+                ),
+                (
+                    "fs_score_mean",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score mean"),
+                ),
+                (
+                    "fs_score_p25",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score 25th percentile"),
+                ),
+                (
+                    "fs_score_p50",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score median"),
+                ),
+                (
+                    "fs_score_p75",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score 75th percentile"),
+                ),
+                (
+                    "fs_score_p90",
+                    models.FloatField(blank=True, null=True, verbose_name="fs score 90th percentile"),
+                ),
+                (
+                    "species",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="score_stats",
+                        to="fisheriescape.species",
+                        verbose_name="species",
+                    ),
+                ),
+                (
+                    "week",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="species_score_stats",
+                        to="fisheriescape.week",
+                        verbose_name="week",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["species", "week"],
+                "unique_together": {("species", "week")},
+            },
+        ),
+    ]
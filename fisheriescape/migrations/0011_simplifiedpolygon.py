@@ -0,0 +1,84 @@
+# Generated by Django 4.1.6 on 2026-10-18 11:20
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0010_speciesscorestats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimplifiedPolygon",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "level",
+                    models.IntegerField(
+                        choices=[
+                            (1, "Low detail"),
+                            (2, "Medium detail"),
+                            (3, "High detail"),
+                        ],
+                        verbose_name="level",
+                    ),
+                ),
+                (
+                    "polygon",
+                    django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326),
+                ),
+                (
+                    "fishery_area",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="simplified_polygons",
+                        to="fisheriescape.fisheryarea",
+                        verbose_name="fishery area",
+                    ),
+                ),
+                (
+                    "hexagon",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="simplified_polygons",
+                        to="fisheriescape.hexagon",
+                        verbose_name="hexagon",
+                    ),
+                ),
+                (
+                    "nafo_area",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="simplified_polygons",
+                        to="fisheriescape.nafoarea",
+                        verbose_name="nafo area",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {
+                    ("level", "hexagon"),
+                    ("level", "fishery_area"),
+                    ("level", "nafo_area"),
+                },
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.6 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0011_simplifiedpolygon"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="score",
+            index=models.Index(
+                fields=["hexagon", "species", "week"],
+                include=("site_score", "ceu_score", "fs_score"),
+                name="score_hexagon_species_week",
+            ),
+        ),
+    ]
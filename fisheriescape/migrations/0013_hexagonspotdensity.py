@@ -0,0 +1,72 @@
+# Generated by Django 4.1.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0012_score_hexagon_species_week"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HexagonSpotDensity",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "total_count",
+                    models.IntegerField(default=0, verbose_name="total count"),
+                ),
+                (
+                    "sighting_count",
+                    models.IntegerField(default=0, verbose_name="sighting count"),
+                ),
+                (
+                    "hexagon",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spot_densities",
+                        to="fisheriescape.hexagon",
+                        verbose_name="hexagon",
+                    ),
+                ),
+                (
+                    "vulnerable_species",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hexagon_spot_densities",
+                        to="fisheriescape.vulnerablespecies",
+                        verbose_name="vulnerable species",
+                    ),
+                ),
+                (
+                    "week",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hexagon_spot_densities",
+                        to="fisheriescape.week",
+                        verbose_name="week",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("hexagon", "vulnerable_species", "week")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="hexagonspotdensity",
+            index=models.Index(
+                fields=["week", "hexagon"], name="hexagonspotdensity_week_hexagon"
+            ),
+        ),
+    ]
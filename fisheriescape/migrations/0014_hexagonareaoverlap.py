@@ -0,0 +1,63 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0013_hexagonspotdensity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HexagonAreaOverlap",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fraction", models.FloatField(verbose_name="overlap fraction")),
+                (
+                    "fishery_area",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hexagon_overlaps",
+                        to="fisheriescape.fisheryarea",
+                        verbose_name="fishery area",
+                    ),
+                ),
+                (
+                    "hexagon",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="area_overlaps",
+                        to="fisheriescape.hexagon",
+                        verbose_name="hexagon",
+                    ),
+                ),
+                (
+                    "nafo_area",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hexagon_overlaps",
+                        to="fisheriescape.nafoarea",
+                        verbose_name="nafo area",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("fishery_area", "hexagon"), ("nafo_area", "hexagon")},
+            },
+        ),
+    ]
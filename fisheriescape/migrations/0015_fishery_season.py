@@ -0,0 +1,35 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:25
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fisheriescape", "0014_hexagonareaoverlap"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fishery",
+            name="season",
+            field=django.contrib.postgres.fields.ranges.DateTimeRangeField(
+                blank=True, editable=False, null=True, verbose_name="season"
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE fisheriescape_fishery SET season = tstzrange(start_date, end_date, '[]')
+                WHERE start_date IS NOT NULL AND end_date IS NOT NULL AND start_date <= end_date
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="fishery",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["season"], name="fishery_season"
+            ),
+        ),
+    ]
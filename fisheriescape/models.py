@@ -2,11 +2,17 @@ import os
 
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.gis.db import models
+from django.contrib.gis.db.models.functions import Area, Intersection
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
+from psycopg2.extras import DateTimeTZRange
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from shared_models.models import MetadataFields
+from .db_functions import Multi, SimplifyPreserveTopology
 
 
 class NAFOArea(models.Model):
@@ -208,6 +214,8 @@ class Fishery(MetadataFields):
     participant_detail = models.TextField(null=True, blank=True, verbose_name=_("participant detail"))
     start_date = models.DateTimeField(null=True, blank=True, verbose_name=_("start date of season"))
     end_date = models.DateTimeField(null=True, blank=True, verbose_name=_("end date of season"))
+    # start_date to end_date, kept in step by save() for the interval queries of the active fisheries
+    season = DateTimeRangeField(null=True, blank=True, editable=False, verbose_name=_("season"))
     fishery_status = models.CharField(max_length=255, null=True, blank=True, choices=STATUS_CHOICES,
                                       verbose_name=_("fishery status"))
     license_type = models.CharField(max_length=255, null=True, blank=True, choices=LICENSE_CHOICES,
@@ -249,6 +257,21 @@ class Fishery(MetadataFields):
 
     class Meta:
         ordering = ["start_date", "species", ]
+        indexes = [
+            GistIndex(fields=["season"], name="%(class)s_season"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.season = self.get_season()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "season"}
+        super().save(*args, **kwargs)
+
+    def get_season(self):
+        """ Season as a range including both of its dates, None unless both are set and in order """
+        if self.start_date and self.end_date and self.start_date <= self.end_date:
+            return DateTimeTZRange(self.start_date, self.end_date, "[]")
+        return None
 
     def __str__(self):
         # check to see if a french value is given
@@ -387,6 +410,104 @@ class Hexagon(models.Model):
         ]
 
 
+class SimplifiedPolygon(models.Model):
+    """
+    Copy of the polygon of a Hexagon, FisheryArea or NAFOArea simplified with ST_SimplifyPreserveTopology, served
+    instead of the full polygon to maps drawn at low zooms. Built by load.simplified_polygons_run.
+    """
+    LEVEL_CHOICES = (
+        (1, _("Low detail")),
+        (2, _("Medium detail")),
+        (3, _("High detail")),
+    )
+    # simplification tolerance of each level, in degrees
+    TOLERANCES = {1: 0.05, 2: 0.01, 3: 0.002}
+    # highest map zoom each level is served at, full polygons are served above the last one
+    MAX_ZOOMS = {1: 5, 2: 8, 3: 11}
+    # name of the foreign key to each source model
+    SOURCE_FIELDS = {"hexagon": "hexagon", "fisheryarea": "fishery_area", "nafoarea": "nafo_area"}
+
+    level = models.IntegerField(choices=LEVEL_CHOICES, verbose_name=_("level"))
+    hexagon = models.ForeignKey(Hexagon, on_delete=models.CASCADE, blank=True, null=True,
+                                related_name="simplified_polygons", verbose_name=_("hexagon"))
+    fishery_area = models.ForeignKey(FisheryArea, on_delete=models.CASCADE, blank=True, null=True,
+                                     related_name="simplified_polygons", verbose_name=_("fishery area"))
+    nafo_area = models.ForeignKey(NAFOArea, on_delete=models.CASCADE, blank=True, null=True,
+                                  related_name="simplified_polygons", verbose_name=_("nafo area"))
+    polygon = models.MultiPolygonField(srid=4326)
+
+    class Meta:
+        unique_together = (('level', 'hexagon'), ('level', 'fishery_area'), ('level', 'nafo_area'),)
+
+    def __str__(self):
+        my_str = "{}".format(self.hexagon or self.fishery_area or self.nafo_area)
+        return my_str + f' ({self.get_level_display()})'
+
+    @classmethod
+    def get_source_field(cls, model):
+        return cls.SOURCE_FIELDS[model._meta.model_name]
+
+    @classmethod
+    def build(cls, queryset):
+        """ Replace the simplified copies of a queryset of Hexagon, FisheryArea or NAFOArea at every level """
+        source_field = cls.get_source_field(queryset.model)
+        cls.objects.filter(**{f"{source_field}__in": queryset}).delete()
+        for level, tolerance in cls.TOLERANCES.items():
+            polygons = queryset.annotate(
+                simplified=Multi(SimplifyPreserveTopology("polygon", tolerance))
+            ).values_list("id", "simplified")
+            cls.objects.bulk_create([
+                cls(level=level, polygon=polygon, **{f"{source_field}_id": source_id})
+                for source_id, polygon in polygons.iterator()
+            ], batch_size=1000)
+
+
+class HexagonAreaOverlap(models.Model):
+    """
+    Part of a Hexagon covered by a FisheryArea or a NAFOArea, as a fraction of the hexagon area. Built by a spatial
+    join in load.area_overlaps_run or the build_area_overlaps command, so that scores can be filtered and rolled up
+    by area without intersecting polygons at request time.
+    """
+    # name of the foreign key to each area model
+    SOURCE_FIELDS = {"fisheryarea": "fishery_area", "nafoarea": "nafo_area"}
+
+    hexagon = models.ForeignKey(Hexagon, on_delete=models.CASCADE, related_name="area_overlaps",
+                                verbose_name=_("hexagon"))
+    fishery_area = models.ForeignKey(FisheryArea, on_delete=models.CASCADE, blank=True, null=True,
+                                     related_name="hexagon_overlaps", verbose_name=_("fishery area"))
+    nafo_area = models.ForeignKey(NAFOArea, on_delete=models.CASCADE, blank=True, null=True,
+                                  related_name="hexagon_overlaps", verbose_name=_("nafo area"))
+    fraction = models.FloatField(verbose_name=_("overlap fraction"))
+
+    class Meta:
+        unique_together = (('fishery_area', 'hexagon'), ('nafo_area', 'hexagon'),)
+
+    def __str__(self):
+        return f"{self.hexagon} - {self.fishery_area or self.nafo_area} ({self.fraction:.2f})"
+
+    @classmethod
+    def get_source_field(cls, model):
+        return cls.SOURCE_FIELDS[model._meta.model_name]
+
+    @classmethod
+    def build(cls, queryset):
+        """ Replace the overlaps of a queryset of FisheryArea or NAFOArea with the hexagons """
+        source_field = cls.get_source_field(queryset.model)
+        cls.objects.filter(**{f"{source_field}__in": queryset}).delete()
+        for area in queryset.only("id", "polygon").iterator():
+            # the GiST index of the hexagons finds the candidates, the intersection is only computed for them
+            hexagons = Hexagon.objects.filter(polygon__intersects=area.polygon).annotate(
+                overlap=Area(Intersection("polygon", area.polygon)),
+                hexagon_area=Area("polygon"),
+            ).values_list("id", "overlap", "hexagon_area")
+            cls.objects.bulk_create([
+                cls(hexagon_id=hexagon_id, fraction=min(overlap.standard / hexagon_area.standard, 1),
+                    **{f"{source_field}_id": area.id})
+                for hexagon_id, overlap, hexagon_area in hexagons
+                if hexagon_area.standard and overlap.standard
+            ], batch_size=1000)
+
+
 class Score(models.Model):
     hexagon = models.ForeignKey(Hexagon, on_delete=models.DO_NOTHING, related_name="scores",
                                 verbose_name=_("hexagon"))
@@ -410,18 +531,66 @@ class Score(models.Model):
         ordering = ['species', 'week', ]
         unique_together = (('hexagon', 'week', 'species'),)
         indexes = [
+            # serves the season of a hexagon from the index alone
+            models.Index(["hexagon", "species", "week"], name="%(class)s_hexagon_species_week",
+                         include=["site_score", "ceu_score", "fs_score"]),
             models.Index(["species", "week"], name="%(class)s_species_week"),
             models.Index(["week"], name="%(class)s_week"),
             models.Index(["species"], name="%(class)s_species")
         ]
 
 
+class SpeciesScoreStats(models.Model):
+    """
+    Distribution of the scores of a species for a week, or for the whole season when week is null.
+    Maintained by the score importers (see scripts.refresh_species_score_stats).
+    """
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name="score_stats",
+                                verbose_name=_("species"))
+    week = models.ForeignKey(Week, on_delete=models.CASCADE, blank=True, null=True, related_name="species_score_stats",
+                             verbose_name=_("week"))
+    score_count = models.IntegerField(default=0, verbose_name=_("number of scores"))
+    site_score_min = models.FloatField(blank=True, null=True, verbose_name=_("site score min"))
+    site_score_max = models.FloatField(blank=True, null=True, verbose_name=_("site score max"))
+    site_score_mean = models.FloatField(blank=True, null=True, verbose_name=_("site score mean"))
+    site_score_p25 = models.FloatField(blank=True, null=True, verbose_name=_("site score 25th percentile"))
+    site_score_p50 = models.FloatField(blank=True, null=True, verbose_name=_("site score median"))
+    site_score_p75 = models.FloatField(blank=True, null=True, verbose_name=_("site score 75th percentile"))
+    site_score_p90 = models.FloatField(blank=True, null=True, verbose_name=_("site score 90th percentile"))
+    ceu_score_min = models.FloatField(blank=True, null=True, verbose_name=_("ceu score min"))
+    ceu_score_max = models.FloatField(blank=True, null=True, verbose_name=_("ceu score max"))
+    ceu_score_mean = models.FloatField(blank=True, null=True, verbose_name=_("ceu score mean"))
+    ceu_score_p25 = models.FloatField(blank=True, null=True, verbose_name=_("ceu score 25th percentile"))
+    ceu_score_p50 = models.FloatField(blank=True, null=True, verbose_name=_("ceu score median"))
+    ceu_score_p75 = models.FloatField(blank=True, null=True, verbose_name=_("ceu score 75th percentile"))
+    ceu_score_p90 = models.FloatField(blank=True, null=True, verbose_name=_("ceu score 90th percentile"))
+    fs_score_min = models.FloatField(blank=True, null=True, verbose_name=_("fs score min"))
+    fs_score_max = models.FloatField(blank=True, null=True, verbose_name=_("fs score max"))
+    fs_score_mean = models.FloatField(blank=True, null=True, verbose_name=_("fs score mean"))
+    fs_score_p25 = models.FloatField(blank=True, null=True, verbose_name=_("fs score 25th percentile"))
+    fs_score_p50 = models.FloatField(blank=True, null=True, verbose_name=_("fs score median"))
+    fs_score_p75 = models.FloatField(blank=True, null=True, verbose_name=_("fs score 75th percentile"))
+    fs_score_p90 = models.FloatField(blank=True, null=True, verbose_name=_("fs score 90th percentile"))
+
+    class Meta:
+        ordering = ["species", "week"]
+        unique_together = (("species", "week"),)
+
+    def __str__(self):
+        my_str = "{}".format(self.species)
+
+        if self.week:
+            my_str += f' ({self.week})'
+        return my_str
+
+
 class VulnerableSpeciesSpot(models.Model):
     vulnerable_species = models.ForeignKey(VulnerableSpecies, on_delete=models.DO_NOTHING, related_name="spots",
                                            verbose_name=_("vulnerable_species"))
     week = models.ForeignKey(Week, on_delete=models.DO_NOTHING, related_name="vulnerable_species_spots",
                              verbose_name=_("week"))
     count = models.IntegerField(blank=True, null=True, verbose_name=_("count"))
+    # imported as Point(lat, lon): x is the latitude, unlike the polygons of the other models
     point = models.PointField(blank=False, null=False, verbose_name=_("point"))
     date = models.DateField()
 
@@ -440,3 +609,77 @@ class VulnerableSpeciesSpot(models.Model):
             models.Index(["week"], name="%(class)s_week"),
             models.Index(["species"], name="%(class)s_species")
         ]
+
+
+class HexagonSpotDensity(models.Model):
+    """
+    Vulnerable species spots of each hexagon, species and week: the summed count of the spots and their number.
+    Built from a spatial join by scripts.refresh_hexagon_spot_densities when spots are imported.
+    """
+    hexagon = models.ForeignKey(Hexagon, on_delete=models.CASCADE, related_name="spot_densities",
+                                verbose_name=_("hexagon"))
+    vulnerable_species = models.ForeignKey(VulnerableSpecies, on_delete=models.CASCADE,
+                                           related_name="hexagon_spot_densities", verbose_name=_("vulnerable species"))
+    week = models.ForeignKey(Week, on_delete=models.CASCADE, related_name="hexagon_spot_densities",
+                             verbose_name=_("week"))
+    total_count = models.IntegerField(default=0, verbose_name=_("total count"))
+    sighting_count = models.IntegerField(default=0, verbose_name=_("sighting count"))
+
+    class Meta:
+        unique_together = (("hexagon", "vulnerable_species", "week"),)
+        indexes = [
+            models.Index(["week", "hexagon"], name="%(class)s_week_hexagon"),
+        ]
+
+    def __str__(self):
+        return f"{self.hexagon} - {self.vulnerable_species} ({self.week})"
+
+
+IMPORT_JOB_TYPE_CHOICES = (
+    ("scores", _("Fisheriescape scores")),
+    ("vulnerable_species_spots", _("Vulnerable species spots")),
+)
+
+IMPORT_JOB_STATUS_CHOICES = (
+    ("pending", _("Pending")),
+    ("running", _("Running")),
+    ("success", _("Success")),
+    ("failed", _("Failed")),
+)
+
+
+class ImportJob(MetadataFields):
+    """ A csv upload processed in the background by a celery worker """
+    type = models.CharField(max_length=50, choices=IMPORT_JOB_TYPE_CHOICES, verbose_name=_("type"))
+    status = models.CharField(max_length=25, choices=IMPORT_JOB_STATUS_CHOICES, default="pending",
+                              verbose_name=_("status"))
+    file = models.FileField(upload_to="fisheriescape/imports/", verbose_name=_("file"))
+    rows_processed = models.IntegerField(default=0, verbose_name=_("rows processed"))
+    count_success = models.IntegerField(default=0, verbose_name=_("rows imported"))
+    error_count = models.IntegerField(default=0, verbose_name=_("errors"))
+    # only a sample of the errors is kept so that a badly formatted file does not bloat the table
+    error_samples = models.JSONField(default=list, blank=True, verbose_name=_("error samples"))
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name=_("started at"))
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name=_("finished at"))
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return "{} ({})".format(self.get_type_display(), self.get_status_display())
+
+    @property
+    def is_finished(self):
+        return self.status in ("success", "failed")
+
+    @property
+    def duration(self):
+        if not self.started_at:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @property
+    def rows_per_second(self):
+        if not self.duration:
+            return None
+        return round(self.rows_processed / self.duration)
@@ -1,13 +1,30 @@
+import codecs
 import csv
 import datetime
 import json
 import os
+from decimal import Decimal, InvalidOperation
 
+from django.contrib.gis.db.models import PointField
 from django.contrib.gis.geos import Point
 from django.utils import timezone
 from django.core import serializers
+from django.db import transaction
+from django.db.models import Avg, Count, ExpressionWrapper, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 from fisheriescape import models
+from fisheriescape.cache import VULNERABLE_SPECIES_SPOTS_DATASET, bump_generation, invalidate_scores
+from fisheriescape.db_functions import FlipCoordinates, PercentileCont
+
+# number of score rows staged in memory before being written with a single upsert
+SCORE_IMPORT_BATCH_SIZE = 5000
+SCORE_UNIQUE_FIELDS = ["hexagon", "week", "species"]
+SCORE_VALUE_FIELDS = ["site_score", "ceu_score", "fs_score"]
+# percentiles kept in SpeciesScoreStats
+SCORE_STATS_PERCENTILES = {"p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9}
+# size of the chunks read from an uploaded csv file
+CSV_UPLOAD_CHUNK_SIZE = 64 * 1024
 
 
 # to get list of url names from rest api
@@ -198,6 +215,31 @@ def import_fishery_info():
         print(f'{str(cont_success)} records inserted successfully! ')
 
 
+def iter_uploaded_file_lines(file, encoding: str = "utf-8", chunk_size: int = CSV_UPLOAD_CHUNK_SIZE):
+    """
+    Yield the decoded lines of an uploaded file without loading it in memory.
+
+    The file is read in fixed size chunks (from Django's temporary file for large uploads) and decoded
+    incrementally, so multibyte characters split between two chunks are handled correctly.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in file.chunks(chunk_size=chunk_size):
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def get_reader_from_uploaded_file(file) -> csv.DictReader:
+    """ Return a csv.DictReader streaming the rows of an uploaded csv file """
+    return csv.DictReader(iter_uploaded_file_lines(file), delimiter=',', quotechar='"')
+
+
 def import_scores_info_from_file_path(path: str) -> dict:
     """ a simple function to import information from a csv """
     csv_file = path
@@ -257,6 +299,8 @@ def import_all_vulnerable_species_spots(folder_path: str) -> dict:
 def import_vulnerable_species_from_reader(reader: csv.DictReader) -> dict:
     count_success = 0
     errors = []
+    # (vulnerable species id, week id) pairs written by this import
+    species_weeks = set()
     for row in reader:
         try:
             vulnerable_species_english_name = row["species"].strip().capitalize()
@@ -277,47 +321,210 @@ def import_vulnerable_species_from_reader(reader: csv.DictReader) -> dict:
                 point=Point(float(row["lat"].strip()), float(row["lon"].strip())),
             )
 
+            species_weeks.add((vulnerable_species_obj.id, week_obj.id))
             count_success += 1
         except Exception as e:
             errors.append(f"❌ error inserting line {row} : {e}")
 
+    refresh_hexagon_spot_densities(species_weeks)
+    bump_generation(VULNERABLE_SPECIES_SPOTS_DATASET)
+
     return {
         "count_success": count_success,
         "errors": errors,
     }
 
 
-def import_scores_from_reader(reader: csv.DictReader) -> dict:
+def import_scores_from_reader(reader: csv.DictReader, batch_size: int = SCORE_IMPORT_BATCH_SIZE) -> dict:
+    """
+    Bulk import of fisheriescape scores.
+
+    Hexagon, Species and Week keys are resolved once into in-memory lookups, rows are validated and staged in
+    batches and every batch is upserted with a single INSERT ... ON CONFLICT on the (hexagon, week, species) key.
+    Rows that cannot be parsed or resolved are reported in `errors` without stopping the import. Unlike species and
+    weeks, hexagons are not created on the fly since they cannot exist without their polygon: a row with an unknown
+    grid id is an error. When a batch repeats a (hexagon, week, species) key, only its last row is written and the
+    earlier ones are reported as errors, so that `count_success` is the number of rows actually written.
+
+    The score statistics of the species written are refreshed and the stored GeoJSON of every (species, week)
+    pair written is invalidated; these pairs are returned in
+    `species_weeks` so that the caller can render them again.
+    """
     count_success = 0
     errors = []
-    for row in reader:
-        try:
-            # Get or create FK fields first
-            hexagon_obj, created = models.Hexagon.objects.get_or_create(
-                grid_id=str(row["grid.id"].strip())
-            )
+    # (species id, week id) pairs written by this import
+    species_weeks = set()
+
+    hexagon_ids = dict(models.Hexagon.objects.values_list("grid_id", "id"))
+    species_ids = {
+        english_name.lower(): species_id
+        for species_id, english_name in models.Species.objects.values_list("id", "english_name")
+        if english_name
+    }
+    week_ids = dict(models.Week.objects.values_list("week_number", "id"))
 
-            species_obj, created = models.Species.objects.get_or_create(
-                defaults={'english_name': str(row["sw2"].strip()[:-19].strip())},
-                english_name__iexact=str(row["sw2"].strip()[:-19].strip())
-            )
+    # keyed on the unique key, since an upsert cannot touch the same row twice
+    batch = {}
 
-            week_obj, created = models.Week.objects.get_or_create(
-                week_number=row["sw"].strip()
-            )
-            created, _ = models.Score.objects.get_or_create(
-                hexagon=hexagon_obj,
-                species=species_obj,
-                week=week_obj,
-                site_score=row["ss.std"].strip(),
-                ceu_score=row["ceu"].strip(),
-                fs_score=row["fs"].strip(),
+    def flush():
+        nonlocal count_success
+        if not batch:
+            return
+        rows = list(batch.values())
+        batch.clear()
+        try:
+            with transaction.atomic():
+                models.Score.objects.bulk_create(
+                    [score for row, score in rows],
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=SCORE_UNIQUE_FIELDS,
+                    update_fields=SCORE_VALUE_FIELDS,
+                )
+        except Exception as e:
+            errors.extend(f"❌ error inserting line {row} : {e}" for row, score in rows)
+        else:
+            count_success += len(rows)
+            species_weeks.update((score.species_id, score.week_id) for row, score in rows)
+
+    for row in reader:
+        try:
+            grid_id = str(row["grid.id"].strip())
+            hexagon_id = hexagon_ids.get(grid_id)
+            if hexagon_id is None:
+                raise ValueError(f"hexagon with grid id '{grid_id}' does not exist")
+
+            species_english_name = str(row["sw2"].strip()[:-19].strip())
+            species_id = species_ids.get(species_english_name.lower())
+            if species_id is None:
+                species_id = models.Species.objects.create(english_name=species_english_name).id
+                species_ids[species_english_name.lower()] = species_id
+
+            week_number = int(row["sw"].strip())
+            week_id = week_ids.get(week_number)
+            if week_id is None:
+                week_id = models.Week.objects.create(week_number=week_number).id
+                week_ids[week_number] = week_id
+
+            score = models.Score(
+                hexagon_id=hexagon_id,
+                species_id=species_id,
+                week_id=week_id,
+                site_score=_parse_score(row["ss.std"]),
+                ceu_score=_parse_score(row["ceu"]),
+                fs_score=_parse_score(row["fs"]),
             )
-            count_success += 1
         except Exception as e:
             errors.append(f"❌ error inserting line {row} : {e}")
+            continue
+
+        key = (hexagon_id, week_id, species_id)
+        if key in batch:
+            errors.append(
+                f"❌ error inserting line {batch[key][0]} : replaced by a later line for the same hexagon, week and species")
+        batch[key] = (row, score)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    refresh_species_score_stats(species_weeks)
+    invalidate_scores(species_weeks)
 
     return {
         "count_success": count_success,
-        "errors": errors
+        "errors": errors,
+        "species_weeks": species_weeks,
     }
+
+
+def _parse_score(value: str):
+    """ Convert a raw csv score to a Decimal; empty cells are stored as null """
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"'{value}' is not a valid score")
+
+
+def get_score_stats_aggregates() -> dict:
+    """ Aggregates computing every SpeciesScoreStats value, keyed by field name """
+    aggregates = {"score_count": Count("id")}
+    for field in SCORE_VALUE_FIELDS:
+        aggregates[f"{field}_min"] = Min(field)
+        aggregates[f"{field}_max"] = Max(field)
+        aggregates[f"{field}_mean"] = Avg(field)
+        for name, percentile in SCORE_STATS_PERCENTILES.items():
+            aggregates[f"{field}_{name}"] = PercentileCont(field, percentile)
+    return aggregates
+
+
+def refresh_species_score_stats(species_weeks=None):
+    """
+    Recompute the SpeciesScoreStats rows of the given (species id, week id) pairs, along with the whole season rows of
+    their species. Every pair present in the Score table is refreshed if none are given.
+    """
+    if species_weeks is None:
+        species_weeks = models.Score.objects.values_list("species", "week").distinct().order_by()
+    species_weeks = set(species_weeks)
+    if not species_weeks:
+        return
+    species_ids = {species_id for species_id, week_id in species_weeks}
+    # refreshing every week of these species that was imported is cheaper than filtering pair by pair
+    week_ids = {week_id for species_id, week_id in species_weeks}
+    aggregates = get_score_stats_aggregates()
+
+    scores = models.Score.objects.filter(species__in=species_ids).order_by()
+    stats_rows = list(scores.filter(week__in=week_ids).values("species", "week").annotate(**aggregates))
+    stats_rows += list(scores.values("species").annotate(**aggregates))
+
+    with transaction.atomic():
+        models.SpeciesScoreStats.objects.filter(species__in=species_ids, week__in=week_ids).delete()
+        models.SpeciesScoreStats.objects.filter(species__in=species_ids, week__isnull=True).delete()
+        models.SpeciesScoreStats.objects.bulk_create([
+            models.SpeciesScoreStats(species_id=stats.pop("species"), week_id=stats.pop("week", None), **stats)
+            for stats in stats_rows
+        ])
+
+
+def refresh_hexagon_spot_densities(species_weeks=None):
+    """
+    Recompute the HexagonSpotDensity rows of the given (vulnerable species id, week id) pairs from a spatial join of
+    their spots with the hexagons. Every pair present in the VulnerableSpeciesSpot table is refreshed if none are
+    given.
+    """
+    spots = models.VulnerableSpeciesSpot.objects.order_by()
+    if species_weeks is not None:
+        species_weeks = set(species_weeks)
+        if not species_weeks:
+            return
+        species_ids = {species_id for species_id, week_id in species_weeks}
+        week_ids = {week_id for species_id, week_id in species_weeks}
+        spots = spots.filter(vulnerable_species__in=species_ids, week__in=week_ids)
+
+    # a spot on the edge of two hexagons is counted in one of them only. The outer reference is wrapped so that
+    # FlipCoordinates knows it is given a geometry, which a bare OuterRef does not tell it.
+    point = ExpressionWrapper(OuterRef("point"), output_field=PointField())
+    hexagon = models.Hexagon.objects.filter(polygon__intersects=FlipCoordinates(point)).order_by("id")
+    densities = spots.annotate(hexagon=Subquery(hexagon.values("id")[:1])).filter(hexagon__isnull=False).values(
+        "hexagon", "vulnerable_species", "week").annotate(
+        total_count=Sum(Coalesce("count", 0)),
+        sighting_count=Count("id"),
+    )
+
+    with transaction.atomic():
+        existing = models.HexagonSpotDensity.objects.all()
+        if species_weeks is not None:
+            existing = existing.filter(vulnerable_species__in=species_ids, week__in=week_ids)
+        existing.delete()
+        models.HexagonSpotDensity.objects.bulk_create([
+            models.HexagonSpotDensity(
+                hexagon_id=density["hexagon"],
+                vulnerable_species_id=density["vulnerable_species"],
+                week_id=density["week"],
+                total_count=density["total_count"],
+                sighting_count=density["sighting_count"],
+            )
+            for density in densities
+        ], batch_size=5000)
@@ -0,0 +1,82 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import models
+from .cache import FISHERIES_DATASET, VULNERABLE_SPECIES_SPOTS_DATASET, bump_generation, invalidate_map_layers, \
+    invalidate_score_references, invalidate_scores
+
+# Scores, hexagons and vulnerable species spots are written in bulk by the importers, which invalidate the caches
+# once per import. Their admin pages do the same for single edits (see admin.CacheInvalidationAdmin).
+
+
+# connected before the cache invalidation below, so that the overlays are rendered again from the rebuilt copies
+@receiver(post_save, sender=models.Hexagon)
+@receiver(post_save, sender=models.FisheryArea)
+@receiver(post_save, sender=models.NAFOArea)
+def rebuild_simplified_polygons_on_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Rebuild the simplified copies of an edited polygon. New polygons are served in full until the next
+    load.simplified_polygons_run, so that loading a shapefile does not simplify one polygon at a time.
+    """
+    if created or raw:
+        return
+    models.SimplifiedPolygon.build(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=models.FisheryArea)
+@receiver(post_delete, sender=models.FisheryArea)
+@receiver(post_save, sender=models.NAFOArea)
+@receiver(post_delete, sender=models.NAFOArea)
+def invalidate_map_layers_on_change(sender, instance, raw=False, **kwargs):
+    """ The stored map overlays are rendered again on their next request """
+    if raw:
+        return
+    invalidate_map_layers()
+
+
+@receiver(post_save, sender=models.FisheryArea)
+@receiver(post_save, sender=models.NAFOArea)
+def rebuild_area_overlaps_on_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Overlap an edited area with the hexagons again. New areas are overlapped by the next load.area_overlaps_run, so
+    that loading a shapefile does not join one polygon at a time.
+    """
+    if created or raw:
+        return
+    models.HexagonAreaOverlap.build(sender.objects.filter(pk=instance.pk))
+    invalidate_scores()
+
+
+@receiver(post_save, sender=models.Species)
+@receiver(post_delete, sender=models.Species)
+@receiver(post_save, sender=models.Week)
+@receiver(post_delete, sender=models.Week)
+def invalidate_scores_on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_score_references()
+
+
+@receiver(post_save, sender=models.VulnerableSpecies)
+@receiver(post_delete, sender=models.VulnerableSpecies)
+@receiver(post_save, sender=models.Week)
+@receiver(post_delete, sender=models.Week)
+def invalidate_vulnerable_species_spots_on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_generation(VULNERABLE_SPECIES_SPOTS_DATASET)
+
+
+@receiver(post_save, sender=models.Fishery)
+@receiver(post_delete, sender=models.Fishery)
+@receiver(m2m_changed, sender=models.Fishery.fishery_areas.through)
+@receiver(post_save, sender=models.FisheryArea)
+@receiver(post_delete, sender=models.FisheryArea)
+@receiver(post_save, sender=models.Species)
+@receiver(post_delete, sender=models.Species)
+@receiver(post_save, sender=models.Week)
+@receiver(post_delete, sender=models.Week)
+def invalidate_fisheries_on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_generation(FISHERIES_DATASET)
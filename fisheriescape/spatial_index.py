@@ -0,0 +1,77 @@
+import threading
+
+import numpy as np
+import shapely
+
+from . import models
+from .cache import MAP_LAYERS_DATASET, SCORE_REFERENCES_DATASET, get_generation
+
+# Process-local STRtrees of the hexagon grid and of the fishery and NAFO areas, to find which polygons contain a
+# coordinate without a database round trip per point. Each tree is built on its first use and built again when the
+# generation of its dataset changes (see cache.bump_generation), so an import or an admin edit is picked up by every
+# process on its next lookup.
+
+
+class SpatialIndex:
+    """ STRtree of the polygons of a model, kept in step with the generation of a cached dataset """
+
+    def __init__(self, model, dataset):
+        self.model = model
+        self.dataset = dataset
+        self.generation = None
+        self.tree = None
+        self.ids = None
+        self.lock = threading.Lock()
+
+    def build(self):
+        ids, polygons = [], []
+        for obj_id, polygon in self.model.objects.order_by("id").values_list("id", "polygon").iterator():
+            ids.append(obj_id)
+            polygons.append(bytes(polygon.wkb))
+        self.ids = np.array(ids, dtype=np.int64)
+        self.tree = shapely.STRtree(shapely.from_wkb(polygons))
+
+    def get_tree(self):
+        generation = get_generation(self.dataset)
+        if generation != self.generation:
+            with self.lock:
+                if generation != self.generation:
+                    self.build()
+                    self.generation = generation
+        return self.tree, self.ids
+
+    def query(self, points) -> list:
+        """ Ids of the polygons containing each of a sequence of (lon, lat) points, as one list per point """
+        tree, ids = self.get_tree()
+        matches = [[] for point in points]
+        if not len(points) or not len(ids):
+            return matches
+        geometries = shapely.points(np.asarray(points, dtype=float).reshape(-1, 2))
+        point_positions, polygon_positions = tree.query(geometries, predicate="intersects")
+        for point_position, polygon_position in zip(point_positions, polygon_positions):
+            matches[point_position].append(int(ids[polygon_position]))
+        for point_matches in matches:
+            point_matches.sort()
+        return matches
+
+
+HEXAGON_INDEX = SpatialIndex(models.Hexagon, SCORE_REFERENCES_DATASET)
+FISHERY_AREA_INDEX = SpatialIndex(models.FisheryArea, MAP_LAYERS_DATASET)
+NAFO_AREA_INDEX = SpatialIndex(models.NAFOArea, MAP_LAYERS_DATASET)
+
+
+def locate_hexagons(points) -> list:
+    """ Id of the hexagon containing each of a sequence of (lon, lat) points, None outside of the grid """
+    return [matches[0] if matches else None for matches in HEXAGON_INDEX.query(points)]
+
+
+def locate_points(points) -> list:
+    """
+    Polygons containing each of a sequence of (lon, lat) points: the id of its hexagon and the ids of its fishery
+    and NAFO areas.
+    """
+    return [
+        {"hexagon": hexagon, "fishery_areas": fishery_areas, "nafo_areas": nafo_areas}
+        for hexagon, fishery_areas, nafo_areas in zip(
+            locate_hexagons(points), FISHERY_AREA_INDEX.query(points), NAFO_AREA_INDEX.query(points))
+    ]
@@ -0,0 +1,150 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from celery import shared_task
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import models
+from .cache import get_popular_score_combinations, get_species_week_names, set_cache_warming_status, \
+    store_score_features, store_score_features_combined
+from .scripts import get_reader_from_uploaded_file, import_scores_from_reader, import_vulnerable_species_from_reader
+
+# how often (in rows read) the progress of a running job is saved
+IMPORT_JOB_PROGRESS_INTERVAL = 10000
+# maximum number of errors stored on a job
+IMPORT_JOB_ERROR_SAMPLE_SIZE = 100
+
+# number of payloads rendered at once by the cache warming job
+CACHE_WARMING_WORKERS = 4
+# how many of the most requested species combinations of ScoreFeatureCombinedView are warmed
+CACHE_WARMING_COMBINATIONS = 20
+
+logger = logging.getLogger(__name__)
+
+IMPORTERS = {
+    "scores": import_scores_from_reader,
+    "vulnerable_species_spots": import_vulnerable_species_from_reader,
+}
+
+
+def track_progress(job, reader):
+    """ Pass the rows of a reader through while periodically saving how many were read on the job """
+    for row in reader:
+        yield row
+        job.rows_processed += 1
+        if job.rows_processed % IMPORT_JOB_PROGRESS_INTERVAL == 0:
+            job.save(update_fields=["rows_processed"])
+
+
+@shared_task(name="fisheriescape_import_job")
+def run_import_job(job_id):
+    job = models.ImportJob.objects.get(pk=job_id)
+    job.status = "running"
+    job.started_at = timezone.now()
+    job.rows_processed = 0
+    job.save(update_fields=["status", "started_at", "rows_processed"])
+
+    try:
+        with job.file.open("rb"):
+            reader = get_reader_from_uploaded_file(job.file)
+            result = IMPORTERS[job.type](track_progress(job, reader))
+    except Exception as e:
+        job.status = "failed"
+        job.error_count += 1
+        job.error_samples = [f"❌ import failed : {e}"]
+    else:
+        job.status = "success"
+        job.count_success = result["count_success"]
+        job.error_count = len(result["errors"])
+        job.error_samples = result["errors"][:IMPORT_JOB_ERROR_SAMPLE_SIZE]
+
+    job.finished_at = timezone.now()
+    job.save()
+
+    if job.type == "scores" and job.status == "success":
+        # render the GeoJSON of the imported pairs now rather than on the first map request
+        species_weeks = [list(species_week) for species_week in result["species_weeks"]]
+        transaction.on_commit(lambda: warm_score_caches.delay(species_weeks))
+
+    return job.status
+
+
+def get_cache_warming_renders(species_weeks=None) -> list:
+    """
+    Renders of the cache warming job: the ScoreFeatureView payload of every (species, week) pair, and the
+    ScoreFeatureCombinedView response of the popular species combinations for each of their weeks
+    """
+    if species_weeks is None:
+        species_weeks = models.Score.objects.values_list("species", "week").distinct().order_by()
+    species_week_names = get_species_week_names(species_weeks)
+
+    renders = [(store_score_features, (species_name, week_number)) for species_name, week_number in species_week_names]
+    week_numbers = sorted({week_number for species_name, week_number in species_week_names})
+    for species_names in get_popular_score_combinations(CACHE_WARMING_COMBINATIONS):
+        renders += [(store_score_features_combined, (species_names, week_number)) for week_number in week_numbers]
+    return renders
+
+
+def run_render_in_thread(render, args):
+    try:
+        render(*args)
+    finally:
+        # each worker thread opens its own database connection
+        connection.close()
+
+
+@shared_task(name="fisheriescape_warm_score_caches")
+def warm_score_caches(species_weeks=None, workers=CACHE_WARMING_WORKERS):
+    """
+    Render the score payloads into the cache, for the given (species id, week id) pairs or for every pair of the
+    Score table, `workers` at a time. The progress and timing are kept in the cache (see
+    cache.get_cache_warming_status).
+    """
+    renders = get_cache_warming_renders(species_weeks)
+    started_at = timezone.now()
+    status = {
+        "status": "running",
+        "started_at": started_at.isoformat(),
+        "finished_at": None,
+        "total": len(renders),
+        "rendered": 0,
+        "errors": 0,
+        "duration": None,
+        "renders_per_second": None,
+    }
+    set_cache_warming_status(status)
+
+    def track(args, error=None):
+        if error is None:
+            status["rendered"] += 1
+        else:
+            status["errors"] += 1
+            logger.warning(f"cache warming failed for {args} : {error}")
+        set_cache_warming_status(status)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_render_in_thread, render, args): args for render, args in renders}
+            for future in as_completed(futures):
+                error = future.exception()
+                track(futures[future], error)
+    else:
+        for render, args in renders:
+            try:
+                render(*args)
+            except Exception as e:
+                track(args, e)
+            else:
+                track(args)
+
+    finished_at = timezone.now()
+    duration = (finished_at - started_at).total_seconds()
+    status.update({
+        "status": "success" if not status["errors"] else "failed",
+        "finished_at": finished_at.isoformat(),
+        "duration": duration,
+        "renders_per_second": status["rendered"] / duration if duration else None,
+    })
+    set_cache_warming_status(status)
+    return status
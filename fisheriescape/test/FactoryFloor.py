@@ -1,6 +1,7 @@
 from io import StringIO
 
 import factory
+from django.core.files.base import ContentFile
 from django.contrib.gis.geos import MultiPolygon, fromstr, Point
 from faker import Faker
 
@@ -199,3 +200,12 @@ class VulnerableSpeciesSpotsFactory(factory.django.DjangoModelFactory):
             'count': faker.random_int(min=0, max=100),
         }
 
+
+
+class ImportJobFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = models.ImportJob
+
+    type = "scores"
+    file = factory.lazy_attribute(lambda o: ContentFile(content=b'"","grid.id","sw","ceu","ss.std","fs","sw2"\n',
+                                                        name="scores.csv"))
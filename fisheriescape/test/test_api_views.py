@@ -1,10 +1,22 @@
-from rest_framework.generics import ListAPIView
+import base64
+import datetime
+import gzip
+import json
+from array import array
+
+from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.reverse import reverse_lazy
-from django.test import tag
+from rest_framework.views import APIView
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import override_settings, tag
+from django.test.utils import CaptureQueriesContext
 
+from fisheriescape import cache as score_cache, models, scripts
 from fisheriescape.api import views
 from fisheriescape.test import FactoryFloor
 from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
+from fisheriescape.test.test_cache import LOCMEM_CACHES
 
 TEST_SPECIES = ["American Lobster","Snow Crab","Atlantic Halibut"]
 TEST_WEEK = 30
@@ -35,6 +47,136 @@ class TestScoreFeatureView(CommonTest):
         response = self.client.get(self.test_url)
         self.assert_dict_has_keys(response.json(), ["type", "max_fs_score", "features"])
 
+    @tag("ScoreFeature", "score_feature", "stored_payload")
+    def test_stored_payload_response(self):
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        response = self.client.get(self.test_url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content).get('features')), 1)
+        self.assertIn("Last-Modified", response)
+
+        # the client copy is still valid
+        response = self.client.get(self.test_url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        # compressed bytes are served as is
+        response = self.client.get(self.test_url, params, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content)).get('type'), "FeatureCollection")
+
+        response = self.client.get(self.test_url, {**params, "week": "thirty"})
+        self.assertEqual(response.status_code, 400)
+
+    @tag("ScoreFeature", "score_feature", "week_range")
+    def test_week_range(self):
+        week = FactoryFloor.WeekFactory(week_number=self.instance.week.week_number % 53 + 1)
+        other_week = FactoryFloor.ScoreFactory(hexagon=self.instance.hexagon, species=self.instance.species, week=week)
+        week_numbers = sorted([self.instance.week.week_number, week.week_number])
+        params = {"species": self.instance.species.english_name, "week_from": week_numbers[0],
+                  "week_to": week_numbers[1], "agg": "sum"}
+        response = self.client.get(self.test_url, params)
+        self.assertEqual(response.status_code, 200)
+        features = response.json()["features"]
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0]["properties"]["week_count"], 2)
+        self.assertAlmostEqual(features[0]["properties"]["fs_score"],
+                               float(self.instance.fs_score + other_week.fs_score), places=4)
+        self.assertAlmostEqual(response.json()["max_fs_score"], features[0]["properties"]["fs_score"])
+
+        response = self.client.get(self.test_url, {**params, "agg": "median"})
+        self.assertEqual(response.status_code, 400)
+
+    @tag("ScoreFeature", "score_feature", "serializer_fields")
+    def test_combined_and_week_range_fields(self):
+        params = {"species": self.instance.species.english_name}
+        combined = self.client.get(reverse_lazy('api:scores-feature-combined'),
+                                   {**params, "week": self.instance.week.week_number})
+        self.assertEqual(combined.status_code, 200)
+        combined_properties = combined.json()["features"][0]["properties"]
+        self.assertNotIn("site_score", combined_properties)
+        self.assertNotIn("ceu_score", combined_properties)
+
+        week_range = self.client.get(self.test_url, {**params, "week_from": 1, "week_to": 53})
+        self.assertEqual(week_range.status_code, 200)
+        self.assert_dict_has_keys(week_range.json()["features"][0]["properties"],
+                                  ["site_score", "ceu_score", "fs_score", "week_count", "species_count", "grid_id"])
+
+    @tag("ScoreFeature", "score_feature", "viewport")
+    def test_viewport(self):
+        minx, miny, maxx, maxy = self.instance.hexagon.polygon.extent
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        response = self.client.get(self.test_url, {**params, "bbox": f"{minx},{miny},{maxx},{maxy}", "zoom": 8})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["features"]), 1)
+
+        # a viewport on the other side of the world
+        far_x = minx - 180 if minx > 0 else minx + 180
+        response = self.client.get(self.test_url, {**params, "bbox": f"{far_x},{miny},{far_x + 0.1},{maxy}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["features"]), 0)
+
+        # PostGIS rendering is limited to the viewport as well
+        params["render"] = "database"
+        response = self.client.get(self.test_url, {**params, "bbox": f"{minx},{miny},{maxx},{maxy}", "zoom": 8})
+        self.assertEqual(len(response.json()["features"]), 1)
+        response = self.client.get(self.test_url, {**params, "bbox": f"{far_x},{miny},{far_x + 0.1},{maxy}"})
+        self.assertEqual(len(response.json()["features"]), 0)
+
+        response = self.client.get(self.test_url, {**params, "bbox": "1,2,3"})
+        self.assertEqual(response.status_code, 400)
+
+    @tag("ScoreFeature", "score_feature", "area_filter")
+    def test_area_filter(self):
+        fishery_area = FactoryFloor.FisheryAreaFactory()
+        models.HexagonAreaOverlap.objects.create(hexagon=self.instance.hexagon, fishery_area=fishery_area, fraction=1)
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        response = self.client.get(self.test_url, {**params, "fishery_area": fishery_area.id})
+        self.assertEqual(len(response.json()["features"]), 1)
+
+        other_fishery_area = FactoryFloor.FisheryAreaFactory()
+        response = self.client.get(self.test_url, {**params, "fishery_area": other_fishery_area.id})
+        self.assertEqual(len(response.json()["features"]), 0)
+
+        # PostGIS rendering is limited to the areas as well
+        response = self.client.get(self.test_url, {**params, "fishery_area": fishery_area.id, "render": "database"})
+        self.assertEqual(len(response.json()["features"]), 1)
+        response = self.client.get(self.test_url, {**params, "fishery_area": other_fishery_area.id,
+                                                   "render": "database"})
+        self.assertEqual(len(response.json()["features"]), 0)
+
+        response = self.client.get(self.test_url, {**params, "nafo_area": "4T"})
+        self.assertEqual(response.status_code, 400)
+
+    @tag("ScoreFeature", "score_feature", "spot_density")
+    def test_spot_density(self):
+        spot = FactoryFloor.VulnerableSpeciesSpotsFactory(week=self.instance.week, count=7)
+        models.HexagonSpotDensity.objects.create(hexagon=self.instance.hexagon, week=self.instance.week,
+                                                 vulnerable_species=spot.vulnerable_species, total_count=7,
+                                                 sighting_count=1)
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number,
+                  "spot_density": "true"}
+        properties = self.client.get(self.test_url, params).json()["features"][0]["properties"]
+        self.assertEqual(properties["spot_total_count"], 7)
+        self.assertEqual(properties["spot_sighting_count"], 1)
+
+        properties = self.client.get(self.test_url, {**params, "vulnerable_species": "Unknown whale"}).json()[
+            "features"][0]["properties"]
+        self.assertEqual(properties["spot_total_count"], 0)
+
+    @tag("ScoreFeature", "score_feature", "database_render")
+    def test_database_render(self):
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        expected = self.client.get(self.test_url, params).json()
+        response = self.client.get(self.test_url, {**params, "render": "database", "precision": 15})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["features"][0]["properties"], expected["features"][0]["properties"])
+        self.assertEqual(result["features"][0]["id"], expected["features"][0]["id"])
+        self.assertEqual(float(result["max_fs_score"]), float(expected["max_fs_score"]))
+
+        response = self.client.get(self.test_url, {**params, "week": "thirty", "render": "database"})
+        self.assertEqual(response.status_code, 400)
+
 
 class TestScoreFeatureCombinedView(CommonTest):
     def setUp(self):
@@ -62,6 +204,344 @@ class TestScoreFeatureCombinedView(CommonTest):
         self.assert_dict_has_keys(response.json(), ["type", "max_fs_score", "features"])
         self.assertEqual(len(response.data.get('features')),2,)
 
+    @tag("ScoreFeature", "score_feature", "query_count")
+    def test_query_count_does_not_depend_on_feature_count(self):
+        species = [FactoryFloor.SpeciesFactory(), FactoryFloor.SpeciesFactory()]
+        small_week, large_week = models.Week.objects.get(week_number=51), models.Week.objects.get(week_number=52)
+        for week, hexagon_count in ((small_week, 2), (large_week, 20)):
+            for hexagon in FactoryFloor.HexagonFactory.create_batch(hexagon_count):
+                for a_species in species:
+                    FactoryFloor.ScoreFactory(hexagon=hexagon, species=a_species, week=week)
+        species_names = [a_species.english_name for a_species in species]
+
+        with CaptureQueriesContext(connection) as small_week_queries:
+            response = self.client.get(self.test_url, {"species": species_names, "week": small_week.week_number})
+        self.assertEqual(len(response.data.get('features')), 2)
+
+        with self.assertNumQueries(len(small_week_queries)):
+            response = self.client.get(self.test_url, {"species": species_names, "week": large_week.week_number})
+        self.assertEqual(len(response.data.get('features')), 20)
+
+    @tag("ScoreFeature", "score_feature", "database_render")
+    def test_database_render(self):
+        params = {"species": TEST_SPECIES, "week": TEST_WEEK}
+        expected = self.client.get(self.test_url, params).json()
+        response = self.client.get(self.test_url, {**params, "render": "database"})
+        self.assert_dict_has_keys(response.json(), ["type", "max_fs_score", "features"])
+        self.assertEqual(len(response.json().get('features')), 2)
+        # both renderers give features of the same shape
+        self.assertEqual(set(response.json()["features"][0]["properties"]),
+                         set(expected["features"][0]["properties"]))
+
+        response = self.client.get(self.test_url, {**params, "week": "thirty", "render": "database"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestHexagonGeometryView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.HexagonFactory()
+        self.test_url = reverse_lazy('api:hexagon-geometry')
+        self.user = self.get_and_login_user()
+
+    @tag("HexagonGeometry", "hexagon_geometry", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.HexagonGeometryView, APIView)
+        self.assert_inheritance(views.HexagonGeometryView, views.FisheriescapeAccessRequired)
+
+    @tag("HexagonGeometry", "hexagon_geometry", "access")
+    def test_view(self):
+        self.assert_good_response(self.test_url)
+
+    @tag("HexagonGeometry", "hexagon_geometry", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:hexagon-geometry', f"/api/fisheriescape/hexagons/geometry/")
+
+    @tag("HexagonGeometry", "hexagon_geometry", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        features = json.loads(response.content)["features"]
+        self.assertEqual([feature["id"] for feature in features], list(range(models.Hexagon.objects.count())))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.test_url, {"version": score_cache.get_grid_version()})
+        self.assertIn("immutable", response["Cache-Control"])
+
+
+class TestScoreArrayView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.test_url = reverse_lazy('api:scores-array')
+        self.user = self.get_and_login_user()
+
+    @tag("ScoreArray", "score_array", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.ScoreArrayView, APIView)
+        self.assert_inheritance(views.ScoreArrayView, views.FisheriescapeAccessRequired)
+
+    @tag("ScoreArray", "score_array", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:scores-array', f"/api/fisheriescape/scores-array/")
+
+    @tag("ScoreArray", "score_array", "correct_response")
+    def test_correct_response(self):
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        result = self.client.get(self.test_url, params).json()
+        self.assert_dict_has_keys(result, ["grid_version", "count", "max_fs_score", "site_score", "ceu_score",
+                                           "fs_score"])
+        hexagon_ids = list(models.Hexagon.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(len(result["fs_score"]), len(hexagon_ids))
+        position = hexagon_ids.index(self.instance.hexagon_id)
+        self.assertAlmostEqual(result["fs_score"][position], float(self.instance.fs_score), places=4)
+        self.assertEqual(sum(score is not None for score in result["fs_score"]), 1)
+
+        response = self.client.get(self.test_url, {"species": self.instance.species.english_name})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestScoreSeasonView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.test_url = reverse_lazy('api:scores-season')
+        self.user = self.get_and_login_user()
+
+    @tag("ScoreSeason", "score_season", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.ScoreSeasonView, APIView)
+        self.assert_inheritance(views.ScoreSeasonView, views.FisheriescapeAccessRequired)
+
+    @tag("ScoreSeason", "score_season", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:scores-season', f"/api/fisheriescape/scores-season/")
+
+    @tag("ScoreSeason", "score_season", "correct_response")
+    def test_correct_response(self):
+        params = {"species": self.instance.species.english_name, "fields": "fs_score,site_score"}
+        result = self.client.get(self.test_url, params).json()
+        self.assert_dict_has_keys(result, ["grid_version", "count", "weeks", "encoding", "fields"])
+        self.assertEqual(set(result["fields"]), {"fs_score", "site_score"})
+
+        # decode the fs scores up to the week of the test score
+        fs_score = result["fields"]["fs_score"]
+        week_position = result["weeks"].index(self.instance.week.week_number)
+        values = [0] * result["count"]
+        for deltas in fs_score["weeks"][:week_position + 1]:
+            deltas = array("h", base64.b64decode(deltas))
+            values = [value + delta for value, delta in zip(values, deltas)]
+        position = list(models.Hexagon.objects.order_by("id").values_list("id", flat=True)).index(
+            self.instance.hexagon_id)
+        self.assertAlmostEqual(values[position] * fs_score["scale"], float(self.instance.fs_score),
+                               delta=fs_score["scale"])
+        present = base64.b64decode(fs_score["present"][week_position])
+        self.assertTrue(present[position // 8] >> (position % 8) & 1)
+
+        response = self.client.get(self.test_url, {**params, "fields": "depth"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestAreaScoreRollupView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.fishery_area = FactoryFloor.FisheryAreaFactory()
+        models.HexagonAreaOverlap.objects.create(hexagon=self.instance.hexagon, fishery_area=self.fishery_area,
+                                                 fraction=0.5)
+        self.test_url = reverse_lazy('api:area-scores')
+        self.user = self.get_and_login_user()
+
+    @tag("AreaScoreRollup", "area_score_rollup", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.AreaScoreRollupView, APIView)
+        self.assert_inheritance(views.AreaScoreRollupView, views.FisheriescapeAccessRequired)
+
+    @tag("AreaScoreRollup", "area_score_rollup", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:area-scores', f"/api/fisheriescape/area-scores/")
+
+    @tag("AreaScoreRollup", "area_score_rollup", "correct_response")
+    def test_correct_response(self):
+        params = {"species": self.instance.species.english_name, "week": self.instance.week.week_number}
+        response = self.client.get(self.test_url, params)
+        self.assertEqual(response.status_code, 200)
+        rollup = {area["id"]: area for area in response.json()}
+        self.assert_dict_has_keys(rollup[self.fishery_area.id],
+                                  ["layer_id", "name", "site_score", "ceu_score", "fs_score", "hexagon_count"])
+        # weighted by the overlap
+        self.assertAlmostEqual(rollup[self.fishery_area.id]["fs_score"], float(self.instance.fs_score) / 2, places=4)
+
+        response = self.client.get(self.test_url, {**params, "agg": "mean"})
+        rollup = {area["id"]: area for area in response.json()}
+        self.assertAlmostEqual(rollup[self.fishery_area.id]["fs_score"], float(self.instance.fs_score), places=4)
+
+        response = self.client.get(self.test_url, {**params, "area_type": "hexagon"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestFisheryCalendarView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.week = FactoryFloor.WeekFactory(approx_start=datetime.date(2023, 6, 4),
+                                             approx_end=datetime.date(2023, 6, 10))
+        self.instance = FactoryFloor.FisheryFactory(
+            start_date=datetime.datetime(2023, 6, 10, 12, tzinfo=datetime.timezone.utc),
+            end_date=datetime.datetime(2023, 7, 31, tzinfo=datetime.timezone.utc),
+            gear_type=models.GEAR_CHOICES[0][0],
+        )
+        self.instance.fishery_areas.add(FactoryFloor.FisheryAreaFactory())
+        self.test_url = reverse_lazy('api:fishery-calendar')
+        self.user = self.get_and_login_user()
+
+    @tag("FisheryCalendar", "fishery_calendar", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.FisheryCalendarView, APIView)
+        self.assert_inheritance(views.FisheryCalendarView, views.FisheriescapeAccessRequired)
+
+    @tag("FisheryCalendar", "fishery_calendar", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:fishery-calendar', f"/api/fisheriescape/fishery-calendar/")
+
+    @tag("FisheryCalendar", "fishery_calendar", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        self.assertEqual(response.status_code, 200)
+        week = next(week for week in response.json() if week["approx_start"] == "2023-06-04")
+        self.assertEqual(week["approx_end"], "2023-06-10")
+        fishery = next(fishery for fishery in week["fisheries"] if fishery["id"] == self.instance.id)
+        self.assertEqual(fishery["gear_type"], self.instance.gear_type)
+        self.assertEqual(len(fishery["fishery_areas"]), 1)
+
+        # the same week two years later
+        response = self.client.get(self.test_url, {"year": 2025})
+        week = next(week for week in response.json() if week["approx_start"] == "2025-06-04")
+        self.assertNotIn(self.instance.id, [fishery["id"] for fishery in week["fisheries"]])
+
+
+class TestHexagonTimeseriesView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory(hexagon=FactoryFloor.HexagonFactory(grid_id="ZZ-1"))
+        self.other_week = FactoryFloor.ScoreFactory(hexagon=self.instance.hexagon, species=self.instance.species)
+        self.test_url = reverse_lazy('api:hexagon-timeseries', args=["ZZ-1"])
+        self.user = self.get_and_login_user()
+
+    @tag("HexagonTimeseries", "hexagon_timeseries", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.HexagonTimeseriesView, APIView)
+        self.assert_inheritance(views.HexagonTimeseriesView, views.FisheriescapeAccessRequired)
+
+    @tag("HexagonTimeseries", "hexagon_timeseries", "access")
+    def test_view(self):
+        self.assert_good_response(self.test_url)
+
+    @tag("HexagonTimeseries", "hexagon_timeseries", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:hexagon-timeseries', f"/api/fisheriescape/hexagons/ZZ-1/timeseries/",
+                                test_url_args=["ZZ-1"])
+
+    @tag("HexagonTimeseries", "hexagon_timeseries", "correct_response")
+    def test_correct_response(self):
+        species_name = self.instance.species.english_name
+        result = self.client.get(self.test_url, {"species": species_name}).json()
+        self.assertEqual(result["grid_id"], "ZZ-1")
+        series = result["species"][species_name]
+        self.assertEqual(series["weeks"], sorted([self.instance.week.week_number, self.other_week.week.week_number]))
+        self.assertEqual(len(series["fs_score"]), 2)
+
+        response = self.client.get(reverse_lazy('api:hexagon-timeseries', args=["unknown"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class TestScoreTileView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.tile_args = [self.instance.species.english_name, self.instance.week.week_number, 0, 0, 0]
+        self.test_url = reverse_lazy('api:score-tile', args=self.tile_args)
+        self.user = self.get_and_login_user()
+
+    @tag("ScoreTile", "score_tile", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.ScoreTileView, APIView)
+        self.assert_inheritance(views.ScoreTileView, views.FisheriescapeAccessRequired)
+
+    @tag("ScoreTile", "score_tile", "access")
+    def test_view(self):
+        self.assert_good_response(self.test_url)
+
+    @tag("ScoreTile", "score_tile", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:score-tile', f"/api/fisheriescape/tiles/Lobster/30/4/2/5.mvt",
+                                test_url_args=["Lobster", 30, 4, 2, 5])
+
+    @tag("ScoreTile", "score_tile", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.mapbox-vector-tile")
+        # the whole world tile contains the test hexagon
+        self.assertTrue(response.content)
+
+        # coordinates outside of the zoom level
+        response = self.client.get(reverse_lazy('api:score-tile', args=self.tile_args[:2] + [1, 2, 0]))
+        self.assertEqual(response.status_code, 404)
+
+    @tag("ScoreTile", "score_tile", "cache")
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_unknown_species_not_cached(self):
+        score_cache.get_cache().clear()
+        response = self.client.get(reverse_lazy('api:score-tile', args=["Unknown species"] + self.tile_args[1:]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.content)
+        self.assertIsNone(score_cache.get_cache().get(
+            score_cache.get_score_tiles_version_key("Unknown species", self.instance.week.week_number)))
+
+        self.client.get(self.test_url)
+        self.assertIsNotNone(score_cache.get_cache().get(
+            score_cache.get_score_tiles_version_key(*self.tile_args[:2])))
+
+
+class TestMapLayerView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.FisheryAreaFactory(layer_id="Lobster")
+        self.test_url = reverse_lazy('api:map-layer', args=["Lobster"])
+        self.user = self.get_and_login_user()
+
+    @tag("MapLayer", "map_layer", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.MapLayerView, APIView)
+        self.assert_inheritance(views.MapLayerView, views.FisheriescapeAccessRequired)
+
+    @tag("MapLayer", "map_layer", "access")
+    def test_view(self):
+        self.assert_good_response(self.test_url)
+
+    @tag("MapLayer", "map_layer", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:map-layer', f"/api/fisheriescape/layers/Lobster/", test_url_args=["Lobster"])
+
+    @tag("MapLayer", "map_layer", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        self.assertEqual(response.status_code, 200)
+        features = json.loads(response.content)["features"]
+        self.assertEqual([feature["properties"]["name"] for feature in features], [self.instance.name])
+        self.assertIn("max-age", response["Cache-Control"])
+
+        response = self.client.get(self.test_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        # an edited area is served again in full
+        self.instance.name = "Renamed area"
+        self.instance.save()
+        response = self.client.get(self.test_url)
+        self.assertEqual(json.loads(response.content)["features"][0]["properties"]["name"], "Renamed area")
+
+        response = self.client.get(reverse_lazy('api:map-layer', args=["Unknown"]))
+        self.assertEqual(response.status_code, 404)
+
 
 class TestVulnerableSpeciesView(CommonTest):
     def setUp(self):
@@ -113,3 +593,126 @@ class TestVulnerableSpeciesSpotsView(CommonTest):
     def test_correct_response(self):
         response = self.client.get(self.test_url)
         self.assert_dict_has_keys(response.json()[0], ["count", "vulnerable_species", "week", "point"])
+
+    @tag("VulnerableSpeciesSpots", "vulnerable_species_spots", "viewport")
+    def test_viewport(self):
+        # spots are stored as (lat, lon) points
+        lat, lon = self.instance.point.x, self.instance.point.y
+        response = self.client.get(self.test_url, {"bbox": f"{lon - 0.1},{lat - 0.1},{lon + 0.1},{lat + 0.1}"})
+        self.assertEqual(len(response.json()), 1)
+
+        far_lon = lon - 180 if lon > 0 else lon + 180
+        response = self.client.get(self.test_url, {"bbox": f"{far_lon - 0.1},{lat - 0.1},{far_lon + 0.1},{lat + 0.1}"})
+        self.assertEqual(len(response.json()), 0)
+
+    @tag("VulnerableSpeciesSpots", "vulnerable_species_spots", "clusters")
+    def test_clusters(self):
+        week = self.instance.week
+        other_species = FactoryFloor.VulnerableSpeciesFactory()
+        spots = [
+            # spots are stored as (lat, lon) points
+            FactoryFloor.VulnerableSpeciesSpotsFactory(week=week, point=Point(47, -64), count=2),
+            FactoryFloor.VulnerableSpeciesSpotsFactory(week=week, point=Point(47.01, -64.01), count=3,
+                                                       vulnerable_species=other_species),
+        ]
+        params = {"cluster": "true", "zoom": 6, "week": week.week_number,
+                  "vulnerable_species": ",".join(spot.vulnerable_species.english_name for spot in spots)}
+        response = self.client.get(self.test_url, params)
+        self.assertEqual(response.status_code, 200)
+        clusters = response.json()
+        # both spots fall in the same grid cell at this zoom
+        self.assertEqual(len(clusters), 1)
+        self.assert_dict_has_keys(clusters[0], ["point", "count", "spots", "species"])
+        self.assertEqual(clusters[0]["count"], 5)
+        self.assertEqual(clusters[0]["species"][other_species.english_name], {"count": 3, "spots": 1})
+        # GeoJSON order
+        lon, lat = clusters[0]["point"]["coordinates"]
+        self.assertAlmostEqual(lon, -64.005)
+        self.assertAlmostEqual(lat, 47.005)
+
+        response = self.client.get(self.test_url, {**params, "method": "kmeans"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(cluster["count"] for cluster in response.json()), 5)
+
+        response = self.client.get(self.test_url, {**params, "method": "dbscan"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestImportJobView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ImportJobFactory()
+        self.test_url = reverse_lazy('api:import-job-detail', args=[self.instance.id])
+        self.user = self.get_and_login_user(in_group="fisheriescape_admin")
+
+    @tag("ImportJob", "import_job", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.ImportJobView, RetrieveAPIView)
+        self.assert_inheritance(views.ImportJobView, views.FisheriescapeAdminAccessRequired)
+
+    @tag("ImportJob", "import_job", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:import-job-detail', f"/api/fisheriescape/import-jobs/{self.instance.id}/",
+                                test_url_args=[self.instance.id])
+
+    @tag("ImportJob", "import_job", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        self.assert_dict_has_keys(response.json(), ["status", "rows_processed", "rows_per_second", "error_samples",
+                                                    "is_finished"])
+
+
+class TestCacheWarmingView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.test_url = reverse_lazy('api:cache-warming')
+        self.user = self.get_and_login_user(in_group="fisheriescape_admin")
+
+    @tag("CacheWarming", "cache_warming", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.CacheWarmingView, APIView)
+        self.assert_inheritance(views.CacheWarmingView, views.FisheriescapeAdminAccessRequired)
+
+    @tag("CacheWarming", "cache_warming", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:cache-warming', f"/api/fisheriescape/cache-warming/")
+
+    @tag("CacheWarming", "cache_warming", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url)
+        self.assert_dict_has_keys(response.json(), ["status"])
+
+
+class TestSpeciesScoreStatsView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.instance = FactoryFloor.ScoreFactory()
+        scripts.refresh_species_score_stats()
+        self.test_url = reverse_lazy('api:species-score-stats')
+        self.user = self.get_and_login_user()
+
+    @tag("SpeciesScoreStats", "species_score_stats", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.SpeciesScoreStatsView, ListAPIView)
+        self.assert_inheritance(views.SpeciesScoreStatsView, views.FisheriescapeAccessRequired)
+
+    @tag("SpeciesScoreStats", "species_score_stats", "access")
+    def test_view(self):
+        self.assert_good_response(self.test_url)
+
+    @tag("SpeciesScoreStats", "species_score_stats", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:species-score-stats', f"/api/fisheriescape/species-score-stats/")
+
+    @tag("SpeciesScoreStats", "species_score_stats", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url, {"species": self.instance.species.english_name})
+        self.assertEqual(len(response.json()), 1)
+        self.assert_dict_has_keys(response.json()[0], ["species", "week", "score_count", "fs_score_max",
+                                                       "fs_score_p50"])
+        self.assertIsNone(response.json()[0]["week"])
+        self.assertAlmostEqual(response.json()[0]["fs_score_max"], float(self.instance.fs_score), places=3)
+
+        response = self.client.get(self.test_url, {"species": self.instance.species.english_name,
+                                                   "week": self.instance.week.week_number})
+        self.assertEqual(len(response.json()), 1)
@@ -0,0 +1,111 @@
+import gzip
+import json
+
+from django.http import QueryDict
+from django.test import override_settings, tag
+from rest_framework.reverse import reverse_lazy
+
+from fisheriescape import cache, tasks
+from fisheriescape.test import FactoryFloor
+from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestApiCacheKeys(CommonTest):
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+
+    @tag("cache", "api_cache_key")
+    def test_normalized_params(self):
+        key = cache.get_api_cache_key("View", cache.SCORES_DATASET, QueryDict("species=b&species=a&week=30"))
+        same_key = cache.get_api_cache_key("View", cache.SCORES_DATASET, QueryDict("week=30&species=a&species=b&zoom="))
+        other_key = cache.get_api_cache_key("View", cache.SCORES_DATASET, QueryDict("species=a&species=c&week=30"))
+        self.assertEqual(key, same_key)
+        self.assertNotEqual(key, other_key)
+        self.assertNotEqual(key, cache.get_api_cache_key("OtherView", cache.SCORES_DATASET, QueryDict("species=a")))
+
+    @tag("cache", "generation")
+    def test_bump_generation(self):
+        key = cache.get_api_cache_key("View", cache.SCORES_DATASET, QueryDict("week=30"))
+        spots_key = cache.get_api_cache_key("View", cache.VULNERABLE_SPECIES_SPOTS_DATASET, QueryDict("week=30"))
+        generation = cache.get_generation(cache.SCORES_DATASET)
+        self.assertEqual(cache.bump_generation(cache.SCORES_DATASET), generation + 1)
+        self.assertNotEqual(key, cache.get_api_cache_key("View", cache.SCORES_DATASET, QueryDict("week=30")))
+        # the other datasets keep their keys
+        self.assertEqual(spots_key,
+                         cache.get_api_cache_key("View", cache.VULNERABLE_SPECIES_SPOTS_DATASET, QueryDict("week=30")))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestApiCacheInvalidation(CommonTest):
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.user = self.get_and_login_user()
+
+    @tag("cache", "combined_cache_key")
+    def test_combined_species_lists(self):
+        other_score = FactoryFloor.ScoreFactory(hexagon=self.instance.hexagon, week=self.instance.week)
+        test_url = reverse_lazy('api:scores-feature-combined')
+        params = {"species": [self.instance.species.english_name], "week": self.instance.week.week_number}
+        response = self.client.get(test_url, params)
+        self.assertEqual(response.json()["features"][0]["properties"]["species_count"], 1)
+        # the whole species list is part of the key
+        params["species"].append(other_score.species.english_name)
+        response = self.client.get(test_url, params)
+        self.assertEqual(response.json()["features"][0]["properties"]["species_count"], 2)
+
+    @tag("cache", "species_invalidation")
+    def test_species_edit(self):
+        test_url = reverse_lazy('api:scores-feature')
+        params = {"week": self.instance.week.week_number}
+        self.client.get(test_url, params)
+        self.instance.species.english_name = "Renamed species"
+        self.instance.species.save()
+        features = self.client.get(test_url, params).json()["features"]
+        feature = next(feature for feature in features if feature["id"] == self.instance.id)
+        self.assertEqual(feature["properties"]["species"], "Renamed species")
+
+    @tag("cache", "stored_payload")
+    def test_unknown_species_week_not_stored(self):
+        week_number = self.instance.week.week_number
+        payload = cache.get_score_features("Unknown species", week_number)
+        self.assertEqual(json.loads(gzip.decompress(payload["content"]))["features"], [])
+        self.assertIsNone(cache.get_cache().get(cache.get_score_features_cache_key("Unknown species", week_number)))
+
+        cache.get_score_features(self.instance.species.english_name, week_number)
+        self.assertIsNotNone(cache.get_cache().get(
+            cache.get_score_features_cache_key(self.instance.species.english_name, week_number)))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestWarmScoreCaches(CommonTest):
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        self.instance = FactoryFloor.ScoreFactory()
+        self.other_score = FactoryFloor.ScoreFactory(hexagon=self.instance.hexagon, week=self.instance.week)
+        self.species_names = [self.instance.species.english_name, self.other_score.species.english_name]
+        cache.record_score_combination(self.species_names)
+
+    @tag("cache", "cache_warming")
+    def test_warm_score_caches(self):
+        species_weeks = [(self.instance.species_id, self.instance.week_id)]
+        status = tasks.warm_score_caches(species_weeks, workers=1)
+        # one species/week payload and the popular combination for the week
+        self.assertEqual(status["total"], 2)
+        self.assertEqual(status["rendered"], 2)
+        self.assertEqual(status["status"], "success")
+        self.assertEqual(cache.get_cache_warming_status(), status)
+
+        species_week_key = cache.get_score_features_cache_key(self.instance.species.english_name,
+                                                             self.instance.week.week_number)
+        self.assertIsNotNone(cache.get_cache().get(species_week_key))
+        combined_key = cache.get_score_features_combined_cache_key(
+            QueryDict(f"species={self.species_names[1]}&species={self.species_names[0]}"
+                      f"&week={self.instance.week.week_number}"))
+        self.assertIsNotNone(cache.get_cache().get(combined_key))
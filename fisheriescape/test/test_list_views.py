@@ -1,14 +1,20 @@
+from django.db import connection
 from django.urls import reverse_lazy
 from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.views.generic import ListView
 from django_filters.views import FilterView
 
+from lib.templatetags import verbose_names
+
 from shared_models.test.SharedModelsFactoryFloor import GroupFactory
 from shared_models.views import CommonFilterView, CommonListView
 from .. import models
 from .. import views
 
 from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
+from fisheriescape.management.commands.benchmark_field_plans import render_table
 from fisheriescape.test import FactoryFloor
 from ..views import FisheriescapeAccessRequired
 
@@ -78,6 +84,44 @@ class TestFisheryListView(CommonTest):
         # use the 'en' locale prefix to url
         self.assert_correct_url("fisheriescape:fishery_list", f"/en/fisheriescape/fishery-list/")
 
+    @tag("Fishery", "fishery_list", "related_lookups")
+    def test_related_lookups(self):
+        select_related, prefetch_related = views.FisheryListView().get_related_lookups(models.Fishery)
+        self.assertEqual(select_related, ["species"])
+        self.assertEqual(prefetch_related, ["fishery_areas"])
+
+    @tag("Fishery", "fishery_list", "related_lookups")
+    def test_constant_queries(self):
+        self.instance.fishery_areas.add(FactoryFloor.FisheryAreaFactory())
+        with CaptureQueriesContext(connection) as one_row:
+            self.client.get(self.test_url)
+        for i in range(5):
+            FactoryFloor.FisheryFactory().fishery_areas.add(FactoryFloor.FisheryAreaFactory())
+        with CaptureQueriesContext(connection) as many_rows:
+            self.client.get(self.test_url)
+        self.assertEqual(len(many_rows), len(one_row))
+
+
+class TestFieldPlanRendering(CommonTest):
+    def setUp(self):
+        super().setUp()
+        species = FactoryFloor.SpeciesFactory()
+        self.fisheries = [
+            models.Fishery(id=i, species=species, start_date=timezone.now(), participants=i, fishery_status="Active")
+            for i in range(20)
+        ]
+        self.field_names = [field["name"] for field in views.FisheryListView.field_list if field["name"] != "fishery_areas"]
+
+    @tag("Fishery", "field_plans")
+    def test_compiled_rendering(self):
+        # see the benchmark_field_plans command for the timings
+        uncompiled = render_table(self.fisheries, self.field_names, compiled=False)
+        verbose_names.FIELD_PLANS.clear()
+        compiled = render_table(self.fisheries, self.field_names)
+        self.assertEqual(compiled, uncompiled)
+        # one plan per column
+        self.assertEqual(len([key for key in verbose_names.FIELD_PLANS if key[0] is models.Fishery]), len(self.field_names))
+
 
 # class TestUserListView(CommonTest):
 #     def setUp(self):
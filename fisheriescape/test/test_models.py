@@ -1,8 +1,11 @@
+import datetime
+
 from django.urls import reverse_lazy
 from django.test import tag
 
 import shared_models
 from fisheriescape import models
+from fisheriescape.filters import FisheryFilter
 from fisheriescape.test import FactoryFloor
 from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
 from faker import Faker
@@ -87,6 +90,50 @@ class TestNAFOAreaModel(CommonTest):
         self.assert_mandatory_fields(models.NAFOArea, fields_to_check)
 
 
+class TestSimplifiedPolygonModel(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.hexagon = FactoryFloor.HexagonFactory()
+        models.SimplifiedPolygon.build(models.Hexagon.objects.filter(pk=self.hexagon.pk))
+
+    @tag('SimplifiedPolygon', 'models', 'build')
+    def test_build(self):
+        # one copy per level
+        self.assertEqual(self.hexagon.simplified_polygons.count(), len(models.SimplifiedPolygon.TOLERANCES))
+        # building again replaces the copies
+        models.SimplifiedPolygon.build(models.Hexagon.objects.filter(pk=self.hexagon.pk))
+        self.assertEqual(self.hexagon.simplified_polygons.count(), len(models.SimplifiedPolygon.TOLERANCES))
+
+    @tag('SimplifiedPolygon', 'models', 'signals')
+    def test_rebuilt_on_change(self):
+        self.hexagon.polygon = FactoryFloor.get_multipolygon()
+        self.hexagon.save()
+        self.assertEqual(self.hexagon.simplified_polygons.count(), len(models.SimplifiedPolygon.TOLERANCES))
+
+
+class TestHexagonAreaOverlapModel(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.hexagon = FactoryFloor.HexagonFactory()
+        self.fishery_area = FactoryFloor.FisheryAreaFactory()
+        models.HexagonAreaOverlap.build(models.FisheryArea.objects.filter(pk=self.fishery_area.pk))
+
+    @tag('HexagonAreaOverlap', 'models', 'build')
+    def test_build(self):
+        overlap = models.HexagonAreaOverlap.objects.get(fishery_area=self.fishery_area, hexagon=self.hexagon)
+        # the factories give every hexagon and area the same polygon
+        self.assertAlmostEqual(overlap.fraction, 1)
+        # building again replaces the overlaps
+        models.HexagonAreaOverlap.build(models.FisheryArea.objects.filter(pk=self.fishery_area.pk))
+        self.assertEqual(self.hexagon.area_overlaps.filter(fishery_area=self.fishery_area).count(), 1)
+
+    @tag('HexagonAreaOverlap', 'models', 'signals')
+    def test_rebuilt_on_change(self):
+        self.fishery_area.polygon = FactoryFloor.get_multipolygon()
+        self.fishery_area.save()
+        self.assertEqual(self.hexagon.area_overlaps.filter(fishery_area=self.fishery_area).count(), 1)
+
+
 class TestMarineMammalModel(CommonTest):
     def setUp(self):
         super().setUp()
@@ -170,6 +217,26 @@ class TestFisheryModel(CommonTest):
     def test_props(self):
         self.assert_has_props(models.Fishery, ["nafo_fishery_areas"])
 
+    @tag('Fishery', 'models', 'season')
+    def test_season(self):
+        self.instance.start_date = datetime.datetime(2023, 5, 1, tzinfo=datetime.timezone.utc)
+        self.instance.end_date = datetime.datetime(2023, 6, 30, tzinfo=datetime.timezone.utc)
+        self.instance.save()
+        self.instance.refresh_from_db()
+        self.assertEqual(self.instance.season.lower, self.instance.start_date)
+        self.assertEqual(self.instance.season.upper, self.instance.end_date)
+
+        fisheries = models.Fishery.objects.filter(pk=self.instance.pk)
+        self.assertEqual(FisheryFilter({"date": "2023-06-15"}, queryset=fisheries).qs.count(), 1)
+        self.assertEqual(FisheryFilter({"date": "2023-07-15"}, queryset=fisheries).qs.count(), 0)
+        # the date filter keeps the other filters
+        self.assertEqual(FisheryFilter({"date": "2023-06-15"}, queryset=fisheries.none()).qs.count(), 0)
+
+        self.instance.end_date = None
+        self.instance.save()
+        self.instance.refresh_from_db()
+        self.assertIsNone(self.instance.season)
+
     @tag('Fishery', 'models', 'm2m')
     def test_m2m_marine_mammal(self):
         # a `my_model` that is attached to a given `marine_mammals` should be accessible by the m2m field name `marine_mammals`
@@ -1,14 +1,21 @@
+import csv
+import io
 import os
+from decimal import Decimal
 
 from rest_framework.generics import ListAPIView
 from rest_framework.reverse import reverse_lazy
+from django.contrib.gis import admin
+from django.contrib.gis.geos import Point
+from django.core.files.base import ContentFile
 from django.test import tag
 
 from fisheriescape.api import views
 from fisheriescape.test import FactoryFloor
 from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
 from fisheriescape import scripts
-from fisheriescape.models import Score, VulnerableSpeciesSpot
+from fisheriescape.admin import ScoreAdmin
+from fisheriescape.models import HexagonSpotDensity, Score, VulnerableSpeciesSpot, SpeciesScoreStats
 
 TEST_SCORES_FOLDER = os.path.join(os.path.dirname(__file__), 'test_data','scores')
 TEST_VULNERABLE_SPECIES_SPOTS_FOLDER = os.path.join(os.path.dirname(__file__), 'test_data','vulnerable_species_spots')
@@ -23,6 +30,45 @@ class TestImportScores(CommonTest):
         result = scripts.import_all_scores(folder_path=TEST_SCORES_FOLDER)
         assert not result.get('errors')
         assert Score.objects.count() == 8 # 5 from fixtures and 3 imported by this test
+        # the three rows are for the same species, on three different weeks
+        assert SpeciesScoreStats.objects.filter(week__isnull=True).count() == 1
+        assert SpeciesScoreStats.objects.filter(week__isnull=False).count() == 3
+
+    @tag("Score", "score_import", "import_upsert")
+    def test_import_is_idempotent(self):
+        scripts.import_all_scores(folder_path=TEST_SCORES_FOLDER)
+        result = scripts.import_all_scores(folder_path=TEST_SCORES_FOLDER)
+        assert not result.get('errors')
+        assert result.get('count_success') == 3
+        assert Score.objects.count() == 8
+
+    @tag("Score", "score_import", "import_errors")
+    def test_import_reports_row_errors(self):
+        csv_file = io.StringIO(
+            '"","grid.id","sw","ceu","ss.std","fs","sw2"\n'
+            '"1","OT-354",30,635.09,0.0017,1.1220,"Atlantic halibut fisheriescape SW30"\n'
+            '"2","not-a-hexagon",30,635.09,0.0017,1.1220,"Atlantic halibut fisheriescape SW30"\n'
+            '"3","OE-276",28,202.64,not-a-score,0.3838,"Atlantic halibut fisheriescape SW28"\n'
+        )
+        result = scripts.import_scores_from_reader(reader=csv.DictReader(csv_file, delimiter=',', quotechar='"'))
+        assert result.get('count_success') == 1
+        assert len(result.get('errors')) == 2
+        # hexagons are not created for unknown grid ids
+        assert "not-a-hexagon" in result.get('errors')[0]
+
+    @tag("Score", "score_import", "import_duplicates")
+    def test_import_duplicate_rows(self):
+        csv_file = io.StringIO(
+            '"","grid.id","sw","ceu","ss.std","fs","sw2"\n'
+            '"1","OT-354",30,635.09,0.0017,1.1220,"Atlantic halibut fisheriescape SW30"\n'
+            '"2","OT-354",30,635.09,0.0017,2.5000,"Atlantic halibut fisheriescape SW30"\n'
+        )
+        result = scripts.import_scores_from_reader(reader=csv.DictReader(csv_file, delimiter=',', quotechar='"'))
+        # the last of the repeated rows is the one written
+        assert result.get('count_success') == 1
+        assert len(result.get('errors')) == 1
+        assert Score.objects.get(hexagon__grid_id="OT-354", week__week_number=30,
+                                 species__english_name="Atlantic halibut").fs_score == Decimal("2.5")
 
 
 class TestImportVulnerableSpots(CommonTest):
@@ -34,3 +80,73 @@ class TestImportVulnerableSpots(CommonTest):
         result =  scripts.import_all_vulnerable_species_spots(folder_path=TEST_VULNERABLE_SPECIES_SPOTS_FOLDER)
         assert not result.get('errors')
         assert VulnerableSpeciesSpot.objects.count() == 29
+
+
+class TestRefreshHexagonSpotDensities(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.hexagon = FactoryFloor.HexagonFactory()
+        self.spot = FactoryFloor.VulnerableSpeciesSpotsFactory(point=Point(20, 10), count=4)
+        FactoryFloor.VulnerableSpeciesSpotsFactory(point=Point(25, 15), count=None, week=self.spot.week,
+                                                   vulnerable_species=self.spot.vulnerable_species)
+        # outside of the grid
+        FactoryFloor.VulnerableSpeciesSpotsFactory(point=Point(20, -100), week=self.spot.week,
+                                                   vulnerable_species=self.spot.vulnerable_species)
+
+    @tag("HexagonSpotDensity", "spot_density", "refresh")
+    def test_refresh(self):
+        scripts.refresh_hexagon_spot_densities({(self.spot.vulnerable_species_id, self.spot.week_id)})
+        densities = HexagonSpotDensity.objects.filter(vulnerable_species=self.spot.vulnerable_species)
+        assert densities.count() == 1
+        assert densities[0].total_count == 4
+        assert densities[0].sighting_count == 2
+
+        # refreshing again replaces the rows
+        self.spot.delete()
+        scripts.refresh_hexagon_spot_densities()
+        densities = HexagonSpotDensity.objects.filter(vulnerable_species=self.spot.vulnerable_species)
+        assert densities.count() == 1
+        assert densities[0].total_count == 0
+        assert densities[0].sighting_count == 1
+
+
+class TestRefreshSpeciesScoreStats(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.score = FactoryFloor.ScoreFactory(fs_score=Decimal("2.5"))
+        self.other_score = FactoryFloor.ScoreFactory(fs_score=Decimal("1.5"), species=self.score.species,
+                                                     week=self.score.week)
+        scripts.refresh_species_score_stats({(self.score.species_id, self.score.week_id)})
+        self.admin = ScoreAdmin(Score, admin.site)
+
+    def get_season_max(self):
+        return SpeciesScoreStats.objects.get(species=self.score.species, week__isnull=True).fs_score_max
+
+    @tag("SpeciesScoreStats", "species_score_stats", "admin")
+    def test_admin_changes_refresh_stats(self):
+        assert self.get_season_max() == 2.5
+
+        self.score.fs_score = Decimal("3.5")
+        self.admin.save_model(None, self.score, None, True)
+        assert self.get_season_max() == 3.5
+
+        self.admin.delete_model(None, self.score)
+        assert self.get_season_max() == 1.5
+
+
+class TestUploadedFileReader(CommonTest):
+
+    @tag("Upload", "uploaded_file_reader", "streaming")
+    def test_lines_are_streamed_across_chunks(self):
+        content = 'species,number\n"baleine à bosse",5\n"rorqual commun",20\n'
+        file = ContentFile(content=content.encode('utf-8'), name="spots.csv")
+        # a tiny chunk size splits the multibyte "à" between two chunks
+        lines = list(scripts.iter_uploaded_file_lines(file, chunk_size=3))
+        self.assertEqual("".join(lines), content)
+        self.assertEqual(len(lines), 3)
+
+    @tag("Upload", "uploaded_file_reader", "reader")
+    def test_reader(self):
+        file = ContentFile(content='species,number\nfin whale,20'.encode('utf-8'), name="spots.csv")
+        rows = list(scripts.get_reader_from_uploaded_file(file))
+        self.assertEqual(rows, [{"species": "fin whale", "number": "20"}])
@@ -0,0 +1,85 @@
+import datetime
+
+from django.test import override_settings, tag
+from rest_framework.reverse import reverse_lazy
+
+from fisheriescape import cache, models, spatial_index
+from fisheriescape.api import views
+from fisheriescape.test import FactoryFloor
+from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestSpatialIndex(CommonTest):
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        self.hexagon = FactoryFloor.HexagonFactory()
+        self.fishery_area = FactoryFloor.FisheryAreaFactory()
+        self.nafo_area = FactoryFloor.NAFOAreaFactory()
+
+    @tag("spatial_index", "locate")
+    def test_locate_points(self):
+        inside, outside = spatial_index.locate_points([(10, 20), (-100, 20)])
+        self.assertIn(self.fishery_area.id, inside["fishery_areas"])
+        self.assertIn(self.nafo_area.id, inside["nafo_areas"])
+        self.assertIsNotNone(inside["hexagon"])
+        self.assertEqual(outside, {"hexagon": None, "fishery_areas": [], "nafo_areas": []})
+        self.assertEqual(spatial_index.locate_points([]), [])
+
+    @tag("spatial_index", "refresh")
+    def test_refresh_on_generation_change(self):
+        self.assertIn(self.hexagon.id, spatial_index.HEXAGON_INDEX.query([(10, 20)])[0])
+        new_hexagon = FactoryFloor.HexagonFactory()
+        # the tree is kept until the dataset changes
+        self.assertNotIn(new_hexagon.id, spatial_index.HEXAGON_INDEX.query([(10, 20)])[0])
+        cache.invalidate_score_references()
+        self.assertIn(new_hexagon.id, spatial_index.HEXAGON_INDEX.query([(10, 20)])[0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestLocateView(CommonTest):
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        self.fishery_area = FactoryFloor.FisheryAreaFactory()
+        self.test_url = reverse_lazy('api:locate')
+        self.user = self.get_and_login_user()
+
+    @tag("spatial_index", "locate", "view")
+    def test_view_class(self):
+        self.assert_inheritance(views.LocateView, views.FisheriescapeAccessRequired)
+
+    @tag("spatial_index", "locate", "correct_url")
+    def test_correct_url(self):
+        self.assert_correct_url('api:locate', f"/api/fisheriescape/locate/")
+
+    @tag("spatial_index", "locate", "correct_response")
+    def test_correct_response(self):
+        response = self.client.get(self.test_url, {"lat": 20, "lon": 10})
+        self.assertEqual(response.status_code, 200)
+        self.assert_dict_has_keys(response.json(), ["lat", "lon", "hexagon", "fishery_areas", "nafo_areas"])
+        self.assertIn(self.fishery_area.id, [area["id"] for area in response.json()["fishery_areas"]])
+
+        response = self.client.get(self.test_url, {"lat": "north"})
+        self.assertEqual(response.status_code, 400)
+
+    @tag("spatial_index", "locate", "week")
+    def test_week_response(self):
+        score = FactoryFloor.ScoreFactory()
+        week = models.Week.objects.filter(week_number=score.week.week_number).first()
+        week.approx_start, week.approx_end = datetime.date(2023, 6, 4), datetime.date(2023, 6, 10)
+        week.save()
+        fishery = FactoryFloor.FisheryFactory(start_date=datetime.datetime(2023, 6, 1, tzinfo=datetime.timezone.utc),
+                                              end_date=datetime.datetime(2023, 6, 30, tzinfo=datetime.timezone.utc))
+        fishery.fishery_areas.add(self.fishery_area)
+
+        response = self.client.get(self.test_url, {"lat": 20, "lon": 10, "week": week.week_number})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(score.species.english_name, [score["species"] for score in response.json()["scores"]])
+        self.assertIn(fishery.id, [fishery["id"] for fishery in response.json()["fisheries"]])
+
+        response = self.client.get(self.test_url, {"lat": 20, "lon": 10, "week": week.week_number, "year": 2030})
+        self.assertEqual(response.json()["fisheries"], [])
@@ -6,6 +6,8 @@ from django.test import tag
 from django.views.generic import FormView
 
 from fisheriescape import views
+from fisheriescape.models import ImportJob
+from fisheriescape.tasks import run_import_job
 from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
 
 TEST_VULNERABLE_SPECIES_SPOTS_DATA_PATH = os.path.join(os.path.dirname(__file__), 'test_data',
@@ -69,6 +71,25 @@ class TestFisheriescapeScoresUploadView(CommonTest):
             data = {"file" : file}
             self.assert_success_url(self.test_url, data=data, user=self.user, expected_code=200)
 
+    @tag("Upload", "import_fisheriescape_scores", "import_job")
+    def test_submit_creates_import_job(self):
+        with open(file=TEST_FISHERIES_SCORES_DATA_PATH, mode="rb") as file:
+            file = ContentFile(content=file.read(), name=os.path.basename(TEST_FISHERIES_SCORES_DATA_PATH))
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                response = self.client.post(self.test_url, data={"file": file})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+
+        import_job = ImportJob.objects.get()
+        self.assertEqual(import_job.status, "pending")
+        # run the celery task inline
+        run_import_job(import_job.id)
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, "success")
+        self.assertEqual(import_job.rows_processed, 3)
+        self.assertEqual(import_job.count_success, 3)
+        self.assertEqual(import_job.error_count, 0)
+
     @tag("Upload", "import_fisheriescape_scores", "correct_url")
     def test_correct_url(self):
         # use the 'en' locale prefix to url
@@ -0,0 +1,77 @@
+from django.test import tag
+
+from fisheriescape import models, utils
+from fisheriescape.test import FactoryFloor
+from fisheriescape.test.common_tests import CommonFisheriescapeTest as CommonTest
+
+
+class TestSimplificationLevel(CommonTest):
+
+    @tag("SimplifiedPolygon", "utils", "simplification_level")
+    def test_level_from_zoom(self):
+        self.assertEqual(utils.get_simplification_level(zoom=3), 1)
+        self.assertEqual(utils.get_simplification_level(zoom=8), 2)
+        self.assertEqual(utils.get_simplification_level(zoom=10), 3)
+        self.assertIsNone(utils.get_simplification_level(zoom=14))
+        self.assertIsNone(utils.get_simplification_level())
+
+    @tag("SimplifiedPolygon", "utils", "simplification_level")
+    def test_level_from_tolerance(self):
+        self.assertEqual(utils.get_simplification_level(tolerance=1), 1)
+        self.assertEqual(utils.get_simplification_level(tolerance=0.01), 2)
+        self.assertIsNone(utils.get_simplification_level(tolerance=0.0001))
+
+    @tag("SimplifiedPolygon", "utils", "simplification_level")
+    def test_level_from_params(self):
+        self.assertEqual(utils.get_simplification_level_from_params({"zoom": "4"}), 1)
+        self.assertEqual(utils.get_simplification_level_from_params({"tolerance": "0.002"}), 3)
+        self.assertIsNone(utils.get_simplification_level_from_params({"zoom": "far"}))
+        self.assertEqual(utils.get_simplification_level_from_params({"level": "2", "zoom": "4"}), 2)
+        self.assertIsNone(utils.get_simplification_level_from_params({"level": "9"}))
+        self.assertIsNone(utils.get_simplification_level_from_params({}))
+
+
+class TestViewport(CommonTest):
+
+    @tag("utils", "viewport")
+    def test_snap_bbox(self):
+        # cells of 360 / 2^4 = 22.5 degrees
+        self.assertEqual(utils.snap_bbox((-66, 44, -60, 48), zoom=4), (-67.5, 22.5, -45, 67.5))
+        # without a zoom, the cells are at least as wide as the bbox
+        self.assertEqual(utils.snap_bbox((-66, 44, -60, 48)), (-67.5, 33.75, -56.25, 56.25))
+        # snapped viewports stay on the globe
+        self.assertEqual(utils.snap_bbox((-170, -80, 170, 80), zoom=0), (-180, -90, 180, 90))
+
+    @tag("utils", "viewport")
+    def test_viewport_from_params(self):
+        viewport = utils.get_viewport_from_params({"bbox": "-66,44,-60,48", "zoom": "4"})
+        self.assertEqual(viewport.extent, (-67.5, 22.5, -45, 67.5))
+        self.assertEqual(viewport.srid, 4326)
+        self.assertEqual(utils.get_viewport_key(viewport), "-67.5,22.5,-45,67.5")
+        self.assertIsNone(utils.get_viewport_from_params({}))
+        for bbox in ("-66,44,-60", "-60,44,-66,48", "west,44,-60,48"):
+            with self.assertRaises(ValueError):
+                utils.get_viewport_from_params({"bbox": bbox})
+
+
+class TestUseSimplifiedPolygons(CommonTest):
+    def setUp(self):
+        super().setUp()
+        self.fishery_area = FactoryFloor.FisheryAreaFactory()
+        self.other_fishery_area = FactoryFloor.FisheryAreaFactory()
+        models.SimplifiedPolygon.build(models.FisheryArea.objects.filter(pk=self.fishery_area.pk))
+
+    @tag("SimplifiedPolygon", "utils", "use_simplified_polygons")
+    def test_simplified_polygons(self):
+        simplified = models.SimplifiedPolygon.objects.get(fishery_area=self.fishery_area, level=1)
+        fishery_areas = utils.use_simplified_polygons(
+            models.FisheryArea.objects.filter(pk__in=[self.fishery_area.pk, self.other_fishery_area.pk]), 1)
+        polygons = {fishery_area.pk: fishery_area.polygon for fishery_area in fishery_areas}
+        self.assertEqual(polygons[self.fishery_area.pk], simplified.polygon)
+        # polygons without a simplified copy are served in full
+        self.assertEqual(polygons[self.other_fishery_area.pk], self.other_fishery_area.polygon)
+
+    @tag("SimplifiedPolygon", "utils", "use_simplified_polygons")
+    def test_full_polygons(self):
+        fishery_areas = utils.use_simplified_polygons(models.FisheryArea.objects.filter(pk=self.fishery_area.pk), None)
+        self.assertEqual(fishery_areas[0].polygon, self.fishery_area.polygon)
@@ -59,8 +59,9 @@ class TestScoreMapView(CommonTest):
     def test_context(self):
         context_vars = [
             "field_list",
-            "lobster_areas",
+            "map_layers",
             "mapbox_api_key",
+            "simplification_max_zooms",
         ]
         self.assert_presence_of_context_vars(self.test_url, context_vars, user=self.user)
 
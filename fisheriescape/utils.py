@@ -0,0 +1,142 @@
+import math
+
+from django.contrib.gis.geos import Polygon
+
+from . import models
+
+# query parameters the simplification level is read from
+SIMPLIFICATION_PARAMS = ("level", "zoom", "tolerance")
+# query parameters the viewport is read from
+VIEWPORT_PARAMS = ("bbox", "zoom")
+MAX_VIEWPORT_ZOOM = 22
+
+
+def get_simplification_level(zoom=None, tolerance=None):
+    """
+    Level of SimplifiedPolygon to serve for a map zoom, or for the largest acceptable tolerance in degrees.
+    None means the full polygons.
+    """
+    if tolerance is not None:
+        for level, level_tolerance in sorted(models.SimplifiedPolygon.TOLERANCES.items(), key=lambda item: -item[1]):
+            if level_tolerance <= tolerance:
+                return level
+        return None
+    if zoom is not None:
+        for level, max_zoom in sorted(models.SimplifiedPolygon.MAX_ZOOMS.items(), key=lambda item: item[1]):
+            if zoom <= max_zoom:
+                return level
+    return None
+
+
+def get_simplification_level_from_params(params):
+    """
+    Read the simplification level from the `level`, `zoom` or `tolerance` query parameter, ignoring invalid values.
+    Maps that work out the level themselves send it as is, so that every zoom of a level shares the same url.
+    """
+    if params.get("level"):
+        try:
+            level = int(params["level"])
+        except ValueError:
+            return None
+        return level if level in models.SimplifiedPolygon.TOLERANCES else None
+    try:
+        zoom = int(params["zoom"]) if params.get("zoom") else None
+        tolerance = float(params["tolerance"]) if params.get("tolerance") else None
+    except ValueError:
+        return None
+    return get_simplification_level(zoom=zoom, tolerance=tolerance)
+
+
+def use_simplified_polygons(objects, level):
+    """
+    Swap the polygon of Hexagon, FisheryArea or NAFOArea objects for their simplified copy at a level. Objects
+    without a copy at that level keep their full polygon, as do all of them when the level is None.
+    """
+    objects = list(objects)
+    if level is None or not objects:
+        return objects
+    source_field = models.SimplifiedPolygon.get_source_field(type(objects[0]))
+    polygons = dict(models.SimplifiedPolygon.objects.filter(
+        level=level,
+        **{f"{source_field}__in": {obj.id for obj in objects}},
+    ).values_list(source_field, "polygon"))
+    for obj in objects:
+        if obj.id in polygons:
+            obj.polygon = polygons[obj.id]
+    return objects
+
+
+def snap_bbox(bbox, zoom=None) -> tuple:
+    """
+    Expand a (minx, miny, maxx, maxy) bbox in degrees to the cells of a grid of 360 / 2^zoom degrees, so that
+    neighbouring viewports share their results. Without a zoom, the grid is the finest one whose cells are at least as
+    wide as the bbox.
+    """
+    minx, miny, maxx, maxy = bbox
+    if zoom is None:
+        zoom = math.floor(math.log2(360 / max(maxx - minx, maxy - miny)))
+    zoom = min(max(zoom, 0), MAX_VIEWPORT_ZOOM)
+    cell = 360 / 2 ** zoom
+    return (
+        max(math.floor(minx / cell) * cell, -180),
+        max(math.floor(miny / cell) * cell, -90),
+        min(math.ceil(maxx / cell) * cell, 180),
+        min(math.ceil(maxy / cell) * cell, 90),
+    )
+
+
+def get_viewport_from_params(params):
+    """
+    Polygon of the `bbox=minx,miny,maxx,maxy` query parameter snapped to the grid of the `zoom` parameter, or None
+    without a bbox. Raises a ValueError for an invalid bbox.
+    """
+    if not params.get("bbox"):
+        return None
+    try:
+        bbox = [float(coordinate) for coordinate in params["bbox"].split(",")]
+    except ValueError:
+        raise ValueError("The bbox must be minx,miny,maxx,maxy in degrees.")
+    if len(bbox) != 4 or bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+        raise ValueError("The bbox must be minx,miny,maxx,maxy in degrees.")
+    zoom = params.get("zoom")
+    zoom = int(zoom) if zoom and zoom.isdigit() else None
+    viewport = Polygon.from_bbox(snap_bbox(bbox, zoom))
+    viewport.srid = 4326
+    return viewport
+
+
+def flip_viewport(viewport):
+    """ Viewport with its axes swapped, to match the (lat, lon) points of VulnerableSpeciesSpot """
+    minx, miny, maxx, maxy = viewport.extent
+    flipped = Polygon.from_bbox((miny, minx, maxy, maxx))
+    flipped.srid = viewport.srid
+    return flipped
+
+
+def get_viewport_key(viewport):
+    """ Text of a snapped viewport for cache keys """
+    if viewport is None:
+        return None
+    return ",".join(f"{coordinate:g}" for coordinate in viewport.extent)
+
+
+def get_area_filters_from_params(params) -> dict:
+    """
+    Ids of the `fishery_area` and `nafo_area` query parameters, keyed by the HexagonAreaOverlap field they filter on.
+    Raises a ValueError for an id that is not a number.
+    """
+    areas = {}
+    for field in models.HexagonAreaOverlap.SOURCE_FIELDS.values():
+        if params.get(field):
+            try:
+                areas[field] = int(params[field])
+            except ValueError:
+                raise ValueError(f"The {field} must be an id.")
+    return areas
+
+
+def filter_scores_by_area(queryset, areas):
+    """ Limit a Score queryset to the hexagons overlapping the given areas (see get_area_filters_from_params) """
+    for field, area_id in (areas or {}).items():
+        queryset = queryset.filter(**{f"hexagon__area_overlaps__{field}": area_id})
+    return queryset
@@ -1,5 +1,4 @@
-import csv
-import io
+import json
 from copy import deepcopy
 
 from django.conf import settings
@@ -7,6 +6,7 @@ from django.utils.translation import gettext as _, gettext_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db import transaction
 from django.db.models import TextField, Value
 from django.db.models.functions import Concat
 from django.http import HttpResponseRedirect
@@ -19,9 +19,10 @@ from django.core.serializers import serialize
 from shared_models.views import CommonFilterView, CommonCreateView, CommonDetailView, CommonUpdateView, \
     CommonDeleteView, CommonHardDeleteView, CommonFormsetView, CommonTemplateView
 from . import models
+from .api.layers import MAP_LAYERS
 from . import forms
 from . import filters
-from .scripts import import_vulnerable_species_from_reader, import_scores_from_reader
+from .tasks import run_import_job
 
 
 class CloserTemplateView(TemplateView):
@@ -737,12 +738,10 @@ class ScoreMapView(FisheriescapeAccessRequired, CommonTemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        context["lobster_areas"] = serialize("geojson", models.FisheryArea.objects.filter(layer_id="Lobster"))
-        context["snow_crab_areas"] = serialize("geojson", models.FisheryArea.objects.filter(layer_id="Crab"))
-        context["herring_areas"] = serialize("geojson", models.FisheryArea.objects.filter(layer_id="Herring"))
-        context["groundfish_areas"] = serialize("geojson", models.FisheryArea.objects.filter(layer_id="Groundfish"))
-        context["nafo_sub_areas"] = serialize("geojson", models.FisheryArea.objects.filter(layer_id="NAFO Subareas"))
-        context["nafo_areas"] = serialize("geojson", models.NAFOArea.objects.filter(layer_id="NAFO"))
+        # the overlays are fetched by the map from the layers api, only their ids are passed to the page
+        context["map_layers"] = json.dumps(list(MAP_LAYERS))
+        # highest zoom of each simplification level, for the map to request the overlays by level
+        context["simplification_max_zooms"] = json.dumps(models.SimplifiedPolygon.MAX_ZOOMS)
 
         context["mapbox_api_key"] = settings.MAPBOX_API_KEY
 
@@ -766,11 +765,14 @@ class ImportVulnerableSpeciesSpotsView(FisheriescapeAdminAccessRequired, FormVie
         context = super().get_context_data(**kwargs)
         form = self.form_class(self.request.POST, self.request.FILES)
         if form.is_valid():
-            file = form.cleaned_data['file']
-            csv_file = io.StringIO(file.read().decode('utf-8'))
-            reader = csv.DictReader(csv_file, delimiter=',', quotechar='"')
-            result = import_vulnerable_species_from_reader(reader)
-            context["post_result"] = result
+            import_job = models.ImportJob.objects.create(
+                type="vulnerable_species_spots",
+                file=form.cleaned_data['file'],
+                created_by=self.request.user,
+            )
+            # the import itself runs on a celery worker once the job is committed
+            transaction.on_commit(lambda: run_import_job.delay(import_job.id))
+            context["import_job"] = import_job
 
         return super(ImportVulnerableSpeciesSpotsView, self).render_to_response(context)
 
@@ -785,10 +787,13 @@ class ImportFisheriescapeScoresView(FisheriescapeAdminAccessRequired, FormView):
         context = super().get_context_data(**kwargs)
         form = self.form_class(self.request.POST, self.request.FILES)
         if form.is_valid():
-            file = form.cleaned_data['file']
-            csv_file = io.StringIO(file.read().decode('utf-8'))
-            reader = csv.DictReader(csv_file, delimiter=',', quotechar='"')
-            result = import_scores_from_reader(reader)
-            context["post_result"] = result
+            import_job = models.ImportJob.objects.create(
+                type="scores",
+                file=form.cleaned_data['file'],
+                created_by=self.request.user,
+            )
+            # the import itself runs on a celery worker once the job is committed
+            transaction.on_commit(lambda: run_import_job.delay(import_job.id))
+            context["import_job"] = import_job
 
         return super(ImportFisheriescapeScoresView, self).render_to_response(context)
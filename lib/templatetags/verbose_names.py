@@ -3,6 +3,7 @@ from django import template
 from django.conf import settings
 from django.core.exceptions import FieldDoesNotExist
 from django.template.defaultfilters import yesno, date
+from django.utils.functional import cached_property
 from django.utils.safestring import SafeString, mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -11,6 +12,86 @@ from lib.templatetags.custom_filters import tohtml
 register = template.Library()
 
 
+# compiled plans of the field specs sent in to the tags below, keyed by (model, field spec). Since the same spec is displayed for every
+# row of a table, the spec is parsed and its field looked up only once per process rather than once per cell.
+FIELD_PLANS = dict()
+
+
+class FieldPlan:
+    """
+    How to display a field spec (e.g. "first_name|The user's first name" or "user.first_name") for a given model: its label, the
+    attribute path to its value and, for model fields, the kind of formatting the value will need.
+    """
+
+    def __init__(self, model, field_name):
+        self.model = model
+        self.field_name = field_name
+        self.field_instance = None
+        self.kind = None
+
+        #  is it a field in another table that we are trying to access (e.g. user.first_name)?
+        if len(field_name.split(".")) > 1:
+            self.attr_path = (field_name.split(".")[0], field_name.split(".")[1].split("|")[0])
+            return
+
+        # if there is a custom label, we need to shed it.
+        self.attr_path = (field_name.split("|")[0],)
+        try:
+            self.field_instance = model._meta.get_field(self.attr_path[0])
+        except (FieldDoesNotExist, AttributeError):
+            # perhaps it is a model property
+            return
+
+        internal_type = self.field_instance.get_internal_type()
+        if internal_type == 'ManyToManyField' or internal_type == 'ManyToManyRel':
+            self.kind = "m2m"
+        elif hasattr(self.field_instance, "choices") and self.field_instance.choices and len(self.field_instance.choices) > 0:
+            self.kind = "choices"
+        elif internal_type == 'DateTimeField':
+            self.kind = "datetime"
+        elif internal_type == 'BooleanField' or internal_type == 'NullBooleanField':
+            self.kind = "boolean"
+
+    @cached_property
+    def verbose_name(self):
+        model, field_name = self.model, self.field_name
+        # at the end of the day, if the user is sending in a custom label, our work is done.
+        if len(field_name.split("|")) > 1:
+            return _(str(field_name.split("|")[1]))
+
+        # this means the field is a foreign key so we will need to separate the first part preceding the "."
+        if len(field_name.split(".")) > 1:
+            return model._meta.get_field(field_name.split(".")[0]).verbose_name
+
+        # try grabbing the instance of that field...
+        try:
+            field_instance = model._meta.get_field(field_name)
+        except (FieldDoesNotExist, AttributeError):
+            # if it does not exist, perhaps we are receiving a model prop (with no custom label)
+            # in which case, the verbose name will in is the same as the field_name..
+            return field_name
+        # if there is no verbose_name attribute, just send back the field name
+        return getattr(field_instance, "verbose_name", field_name)
+
+
+def get_field_plan(instance, field_name):
+    """ Returns the compiled FieldPlan of a field spec for the model of an instance """
+    key = (type(instance), field_name)
+    try:
+        return FIELD_PLANS[key]
+    except KeyError:
+        plan = FIELD_PLANS[key] = FieldPlan(type(instance), field_name)
+        return plan
+
+
+def __special_capitalize__(raw_string):
+    """ Little dance to make sure the first letter is capitalized.
+    Do not want to use the capitalize() method since it makes the remaining portion of str lowercase. This is problematic in
+     cases like: `DFO employee` since that would become `Dfo employee`"""
+    raw_string = str(raw_string)
+    return raw_string[:1].upper() + raw_string[1:]
+
+
 @register.simple_tag
 def get_verbose_label(instance, field_name, crop_html=False):
     """
@@ -29,16 +110,6 @@ def get_verbose_label(instance, field_name, crop_html=False):
     If a model property is received without a custom label, this function will just return the property name being passed in"
     """
 
-    def __special_capitalize__(raw_string):
-        """ Little dance to make sure the first letter is capitalized.
-        Do not want to use the capitalize() method since it makes the remaining portion of str lowercase. This is problematic in
-         cases like: `DFO employee` since that would become `Dfo employee`"""
-        first_letter = raw_string[0].upper()
-        str_list = list(raw_string)
-        str_list[0] = first_letter
-        raw_string = "".join(str_list)
-        return raw_string
-
     if crop_html and field_name.endswith("_html"):
         field_name = field_name.replace("_html", "")
 
@@ -49,32 +120,8 @@ def get_verbose_label(instance, field_name, crop_html=False):
     if instance is None:
         return None
 
-    # at the end of the day, if the user is sending in a custom label, our work is done.
-    elif len(field_name.split("|")) > 1:
-        verbose_name = _(str(field_name.split("|")[1]))
-
-    # check to see if there were any arguments passed in with the field name
-    # this means the field is a foreign key so we will need to separate the first part preceding the "."
-    elif len(field_name.split(".")) > 1:
-        field_name = field_name.split(".")[0]
-        field_instance = instance._meta.get_field(field_name)
-        verbose_name = field_instance.verbose_name
-
-    else:
-        # try grabbing the instance of that field...
-        try:
-            field_instance = instance._meta.get_field(field_name)
-        except (FieldDoesNotExist, AttributeError):
-            # if it does not exist, perhaps we are receiving a model prop (with no custom label)
-            # in which case, the verbose name will in is the same as the field_name..
-            verbose_name = field_name
-        else:
-            try:
-                verbose_name = field_instance.verbose_name
-            except AttributeError:
-                # if there is no verbose_name attribute, just send back the field name
-                verbose_name = field_name
-    return mark_safe(__special_capitalize__(verbose_name))
+    # the verbose name is capitalized on each call since it may be translated to the language of the request
+    return mark_safe(__special_capitalize__(get_field_plan(instance, field_name).verbose_name))
 
 
 @register.simple_tag
@@ -105,73 +152,62 @@ def get_field_value(instance, field_name, format=None, display_time=False, hyper
     # first, if there is no instance, we cannot return anything intelligable
     if instance is None:
         return None
+
+    plan = get_field_plan(instance, field_name)
+    field_instance = plan.field_instance
+
     #  next, let's see if it is field in another table that we are trying to access (e.g. user.first_name
-    elif len(field_name.split(".")) > 1:
-        arg = field_name.split(".")[1]
-        field_name = field_name.split(".")[0]
-        if len(arg.split("|")) > 1:
-            arg = arg.split("|")[0]
+    if len(plan.attr_path) > 1:
         try:
-            field_value = getattr(getattr(instance, field_name), arg)
+            field_value = getattr(getattr(instance, plan.attr_path[0]), plan.attr_path[1])
         except AttributeError:
             # there is no value and therefore the getattr function fails..
             pass
+    elif field_instance is None:
+        # perhaps it is a model property
+        try:
+            field_value = getattr(instance, plan.attr_path[0])
+        except AttributeError:
+            if settings.DB_MODE == "DEV":
+                print(f"Could not evaluate field value for '{plan.attr_path[0]} for object {type(instance)}")
     else:
-        # if there is a custom label, we need to shed it.
-        if len(field_name.split("|")) > 1:
-            # overwrite the field_name arg with the first part of the string
-            field_name = field_name.split("|")[0]
+        val = getattr(instance, plan.attr_path[0])
+        # first check if there is a value :
+        if val is not None and val != "":
+            # check to see if it is a many to many field
+            if plan.kind == "m2m":
+                field_value = str([str(field) for field in val.all() if field is not None]).replace("[", "").replace("]", "").replace("'",
+                                                                                                                    "").replace(
+                    '"', "")
+
+            # check to see if there are choices
+            elif plan.kind == "choices":
+                field_value = getattr(instance, "get_{}_display".format(plan.attr_path[0]))()
+
+            # check to see if it is a datefield
+            elif plan.kind == "datetime":
+                if not date_format:
+                    date_format = "%Y-%m-%d"
+                if display_time:
+                    field_value = val.strftime('{} %H:%M'.format(date_format))
+                else:
+                    field_value = date(val)
 
-        try:
-            field_instance = instance._meta.get_field(field_name)
+            # check to see if it is a url
+            elif str(val).startswith("http"):
+                field_value = '<a href="{url}" target="_blank">{url}</a>'.format(url=val)
 
-        except FieldDoesNotExist:
-            # perhaps it is a model property
-            try:
-                field_value = getattr(instance, field_name)
-            except AttributeError:
-                if settings.DB_MODE == "DEV":
-                    print(f"Could not evaluate field value for '{field_name} for object {type(instance)}")
-        else:
-            val = getattr(instance, field_name)
-            # first check if there is a value :
-            if val is not None and val != "":
-                # check to see if it is a many to many field
-                if field_instance.get_internal_type() == 'ManyToManyField' or field_instance.get_internal_type() == 'ManyToManyRel':
-                    m2m = val
-                    field_value = str([str(field) for field in m2m.all() if field is not None]).replace("[", "").replace("]", "").replace("'",
-                                                                                                                     "").replace(
-                        '"', "")
-
-                # check to see if there are choices
-                elif hasattr(field_instance, "choices") and field_instance.choices and len(field_instance.choices) > 0:
-                    field_value = getattr(instance, "get_{}_display".format(field_name))()
-
-                # check to see if it is a datefield
-                elif field_instance.get_internal_type() == 'DateTimeField':
-                    if not date_format:
-                        date_format = "%Y-%m-%d"
-                    datetime_obj = val
-                    if display_time:
-                        field_value = datetime_obj.strftime('{} %H:%M'.format(date_format))
-                    else:
-                        field_value = date(datetime_obj)
-
-                # check to see if it is a url
-                elif str(val).startswith("http"):
-                    field_value = '<a href="{url}" target="_blank">{url}</a>'.format(url=val)
-
-                # check to see if it is a BooleanField
-                elif field_instance.get_internal_type() == 'BooleanField' or field_instance.get_internal_type() == 'NullBooleanField':
-                    field_value = yesno(val, "Yes,No,Unknown")
-
-                # check to see if hyperlink was provided
-                elif hyperlink:
-                    field_value = mark_safe('<a href="{}">{}</a>'.format(hyperlink, val))
-                else:
-                    field_value = val
+            # check to see if it is a BooleanField
+            elif plan.kind == "boolean":
+                field_value = yesno(val, "Yes,No,Unknown")
+
+            # check to see if hyperlink was provided
+            elif hyperlink:
+                field_value = mark_safe('<a href="{}">{}</a>'.format(hyperlink, val))
             else:
-                field_value = nullmark
+                field_value = val
+        else:
+            field_value = nullmark
 
     # handle some of the formatting
     if "currency" in str(format).lower():
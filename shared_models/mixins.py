@@ -1,7 +1,9 @@
+from django.db.models import QuerySet
 from django.urls import reverse, reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
 from lib.templatetags.custom_filters import nz
+from .utils import get_related_lookups
 
 
 class CommonMixin():
@@ -319,6 +321,10 @@ class CommonListMixin(CommonMixin):
     field_list = None
     # a list of strings of fields to display; not compatible with providing entire field list but is a lightweight alternative
     fields = None
+    # extra relations to load along with the rows, on top of the ones found in the field list (e.g. relations used by a __str__ method)
+    list_select_related = None
+    list_prefetch_related = None
+
     def get_field_list(self):
         if self.field_list:
             return self.field_list
@@ -334,6 +340,29 @@ class CommonListMixin(CommonMixin):
                 payload.append(dict(name=field))
             return payload
 
+    def get_related_lookups(self, model):
+        """
+        Returns the select_related and prefetch_related lookups to apply to the rows of the list. By default these are worked out
+        from the field list so that each cell does not hit the database; override this to take full control.
+        """
+        field_names = [field["name"] if isinstance(field, dict) else field for field in self.get_field_list()]
+        select_related, prefetch_related = get_related_lookups(model, field_names)
+        select_related += [lookup for lookup in self.list_select_related or [] if lookup not in select_related]
+        prefetch_related += [lookup for lookup in self.list_prefetch_related or [] if lookup not in prefetch_related]
+        return select_related, prefetch_related
+
+    def get_related_queryset(self, queryset):
+        """ Applies the lookups of `get_related_lookups` to the queryset of the list """
+        # lists of dicts, values() querysets and combined querysets (e.g. union()) cannot have their relations loaded
+        if not isinstance(queryset, QuerySet) or queryset._fields is not None or queryset.query.combinator:
+            return queryset
+        select_related, prefetch_related = self.get_related_lookups(queryset.model)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
     def get_h1(self):
         # take a stab at getting the h1
         if self.h1:
@@ -1,4 +1,5 @@
 from django.contrib.humanize.templatetags.humanize import naturaltime
+from django.core.exceptions import FieldDoesNotExist
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 
@@ -193,6 +194,39 @@ def get_labels(model):
     return labels
 
 
+def get_related_lookups(model, field_names):
+    """
+    Works out the select_related and prefetch_related lookups needed to display the given fields of a model, as they
+    are written in the field_list of a list view (e.g. "species", "user.first_name" or "app_display|app").
+    Foreign keys and one-to-one fields are joined; many-to-many fields, and any relation reached through one, are prefetched.
+    Model properties are skipped, since there is no way of knowing what they will touch.
+    """
+    select_related = list()
+    prefetch_related = list()
+    for field_name in field_names:
+        # shed the custom label
+        field_name = field_name.split("|")[0]
+        current_model = model
+        path = list()
+        is_prefetch = False
+        for part in field_name.split("."):
+            try:
+                field = current_model._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.one_to_many or not field.related_model:
+                break
+            path.append(part)
+            is_prefetch = is_prefetch or field.many_to_many
+            current_model = field.related_model
+        if path:
+            lookup = "__".join(path)
+            lookups = prefetch_related if is_prefetch else select_related
+            if lookup not in lookups:
+                lookups.append(lookup)
+    return select_related, prefetch_related
+
+
 def remove_nulls(my_list):
     while None in my_list:
         my_list.remove(None)
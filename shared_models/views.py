@@ -325,6 +325,8 @@ class CommonFilterView(FilterView, CommonListMixin):
         return self.extra_button_dict2
 
     def get_context_data(self, **kwargs):
+        # load the relations displayed in the list along with the filtered rows
+        self.object_list = kwargs["object_list"] = self.get_related_queryset(kwargs.get("object_list", self.object_list))
         # we want to update the context with the context vars added by CommonMixin classes
         context = super().get_context_data(**kwargs)
         context.update(super().get_common_context())
@@ -361,6 +363,8 @@ class CommonListView(ListView, CommonListMixin):
     template_name = 'shared_models/generic_filter.html'
 
     def get_context_data(self, **kwargs):
+        # load the relations displayed in the list along with the rows
+        self.object_list = kwargs["object_list"] = self.get_related_queryset(kwargs.get("object_list", self.object_list))
         # we want to update the context with the context vars added by CommonMixin classes
         context = super().get_context_data(**kwargs)
         context.update(super().get_common_context())